@@ -0,0 +1,170 @@
+"""Benchmarks for full chat turns against stubbed OpenAI and OpenAlex"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import function_call, load_fixture, message, reset_caches, tile_works
+
+pytest.importorskip("pytest_benchmark")
+
+# pylint: disable=wrong-import-position,wrong-import-order
+import chat
+import llm_cache
+from conversation_context import (
+    OPENALEX_ID_PATTERN,
+    ConversationContext,
+    count_tokens,
+    item_text,
+)
+from openalex import process_results
+from requirements_store import get_requirements_store
+from tool_output import encode_works
+
+SESSION_ID = "benchmark"
+
+# Search, get topics recommended, pick one, then answer with the papers
+SEARCH_TURN = [
+    [
+        function_call(
+            "get_research_works",
+            {
+                "keywords": "hydrogen storage",
+                "sort_by": "relevance_score",
+                "has_open_access": False,
+            },
+            "call_search",
+        )
+    ],
+    [
+        function_call(
+            "update_user_requirements",
+            {"key": "primary_topic_id", "value": "T10030"},
+            "call_topic",
+        )
+    ],
+    [message("Here are the most relevant papers on hydrogen storage materials.")],
+]
+
+# Details of several papers resolved by one batched tool call
+DETAILS_TURN = [
+    [
+        function_call(
+            "get_work_details",
+            {"work_ids": ["W2100837269", "W2766808518", "10.1038/nature12373"]},
+            "call_details",
+        ),
+    ],
+    [message("Both papers study magnesium hydride composites.")],
+]
+
+
+def new_conversation():
+    """Returns fresh messages for one benchmark round."""
+    reset_caches()
+    get_requirements_store().reset(SESSION_ID)
+    messages = chat.initialise_converstation()
+    messages.append({"role": "user", "content": "Find papers on hydrogen storage"})
+    return (messages, SESSION_ID), {"context": ConversationContext()}
+
+
+@pytest.mark.parametrize(
+    "script", [SEARCH_TURN, DETAILS_TURN], ids=["search", "details"]
+)
+def test_chat_turn(benchmark, openalex_replay, openai_stub, script):
+    """Runs one user turn through the agent loop."""
+    responses = openai_stub(script)
+    messages = benchmark.pedantic(
+        chat.get_chat_responses, setup=new_conversation, rounds=5
+    )
+    assert messages[-1]["role"] == "assistant"
+    assert responses.requests % len(script) == 0
+
+
+def test_chat_turn_streamed(benchmark, openalex_replay, openai_stub):
+    """Runs one user turn with streamed model output."""
+    openai_stub(SEARCH_TURN)
+
+    def stream_turn(messages, session_id, context):
+        return "".join(chat.stream_chat_responses(messages, session_id, None, context))
+
+    text = benchmark.pedantic(stream_turn, setup=new_conversation, rounds=5)
+    assert "hydrogen storage" in text
+
+
+def test_chat_turn_cached(benchmark, openalex_replay, openai_stub, monkeypatch):
+    """Repeats a streamed turn whose model responses are all cached."""
+    monkeypatch.setattr(llm_cache, "LLM_CACHE", "on")
+    monkeypatch.setattr(chat, "OPENAI_TEMPERATURE", 0.0)
+    llm_cache.get_llm_cache().clear()
+    responses = openai_stub(SEARCH_TURN)
+
+    def stream_turn(messages, session_id, context):
+        return "".join(chat.stream_chat_responses(messages, session_id, None, context))
+
+    args, kwargs = new_conversation()
+    stream_turn(*args, **kwargs)
+    requests = responses.requests
+    text = benchmark.pedantic(stream_turn, setup=new_conversation, rounds=5)
+    assert "hydrogen storage" in text
+    assert responses.requests == requests
+    # Cache hits cost no tokens
+    (messages, session_id), kwargs = new_conversation()
+    stream_turn(messages, session_id, kwargs["context"])
+    assert all(usage["input_tokens"] == 0 for usage in kwargs["context"].usage)
+
+
+def tool_turn(turn, works):
+    """Returns the items of a user turn answered with one search tool call."""
+    call_id = f"call_{turn}"
+    return [
+        {"role": "user", "content": f"Find more papers, page {turn}"},
+        {
+            "type": "function_call",
+            "call_id": call_id,
+            "name": "get_more_research_works",
+            "arguments": "{}",
+        },
+        {
+            "type": "function_call_output",
+            "call_id": call_id,
+            "output": encode_works(works[turn * 25 : (turn + 1) * 25]),
+        },
+        {"role": "assistant", "content": f"Here is page {turn} of the results."},
+    ]
+
+
+def test_compact_long_history(benchmark):
+    """A long, tool-heavy history is cut to the token budget without
+    orphaned tool outputs, and compacted outputs keep their OpenAlex IDs."""
+    works = process_results(
+        tile_works(load_fixture("works_page.json")["results"], 40 * 25)
+    )
+    messages = [{"role": "system", "content": "You are a research assistant."}]
+    for turn in range(40):
+        messages += tool_turn(turn, works)
+    messages = messages[:-1]
+    outputs = {m["call_id"]: m["output"] for m in messages if "output" in m}
+    context = ConversationContext(token_budget=4000, chaining=False)
+
+    request = benchmark(context.prepare, messages)
+    context.record(SimpleNamespace(id="resp_1", usage=None))
+
+    items = request["input"]
+    assert items[0]["role"] == "system"
+    assert items[-3:] == messages[-3:]
+    assert sum(count_tokens(item_text(item)) for item in items) <= 4000
+    assert context.usage[-1]["estimated_tokens"] <= 4000
+    calls = {item["call_id"] for item in items if item.get("type") == "function_call"}
+    compacted = 0
+    for item in items[:-3]:
+        if item.get("type") == "function_call_output":
+            assert item["call_id"] in calls
+            ids = json.loads(item["output"])["ids"]
+            assert ids == list(
+                dict.fromkeys(OPENALEX_ID_PATTERN.findall(outputs[item["call_id"]]))
+            )
+            assert ids
+            compacted += 1
+    assert 0 < compacted < 39
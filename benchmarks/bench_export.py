@@ -0,0 +1,104 @@
+"""Benchmarks for the bulk works export"""
+
+import csv
+import json
+import os
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from conftest import load_fixture, tile_works
+
+pytest.importorskip("pytest_benchmark")
+
+# pylint: disable=wrong-import-position,wrong-import-order
+import export
+import openalex
+from requirements_store import initialise_requirements_dictionary
+
+TOTAL = 950
+
+
+def requirements():
+    """Returns the requirements of a topic-filtered export."""
+    user_requirements = initialise_requirements_dictionary()
+    user_requirements["keywords"] = ["hydrogen", "storage"]
+    user_requirements["filters"]["primary_topic_id"] = "T10030"
+    return user_requirements
+
+
+def read_ids(path, fmt):
+    """Returns the work IDs of an export, in file order."""
+    if fmt == "parquet":
+        pq = pytest.importorskip("pyarrow.parquet")
+        return pq.read_table(path).column("id").to_pylist()
+    with open(path, "r", newline="", encoding="utf-8") as fs:
+        if fmt == "csv":
+            return [row["id"] for row in csv.DictReader(fs)]
+        return [json.loads(line)["id"] for line in fs]
+
+
+def leave_partial_batch(path, fmt):
+    """Writes output past the last checkpoint, as a crash mid-batch would."""
+    if fmt == "parquet":
+        parts = sorted(os.listdir(path))
+        with open(os.path.join(path, f"part-{len(parts):05d}.parquet"), "wb") as fs:
+            fs.write(b"PAR1")
+        with open(os.path.join(path, "part-99999.parquet.tmp"), "wb") as fs:
+            fs.write(b"PAR1")
+    else:
+        with open(path, "a", encoding="utf-8") as fs:
+            fs.write("W0,partial")
+
+
+def test_export_works(benchmark, openalex_replay, tmp_path):
+    """Streams 1,000 works to CSV through cursor pages of 200."""
+    path = tmp_path / "works.csv"
+    done = benchmark.pedantic(
+        export.export_works, args=(requirements(), path, "csv", False), rounds=3
+    )
+    assert done == openalex_replay.total
+
+
+@pytest.mark.parametrize("fmt", export.EXPORT_FORMATS)
+def test_export_resumes_after_failed_fetch(monkeypatch, tmp_path, fmt):
+    """A cursor fetch failing partway through stops the export; running it
+    again resumes from the checkpoint and writes every work exactly once."""
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    works = tile_works(load_fixture("works_page.json")["results"], TOTAL)
+    failures = {"400"}
+
+    def fake_request_json(api_url):
+        query = {
+            key: values[0] for key, values in parse_qs(urlsplit(api_url).query).items()
+        }
+        cursor = query["cursor"]
+        if cursor in failures:
+            failures.remove(cursor)
+            raise requests.exceptions.ConnectionError("connection reset")
+        start = 0 if cursor == "*" else int(cursor)
+        next_start = start + int(query["per_page"])
+        return {
+            "meta": {
+                "count": TOTAL,
+                "next_cursor": str(next_start) if next_start < TOTAL else None,
+            },
+            "results": works[start:next_start],
+        }
+
+    monkeypatch.setattr(openalex, "request_json", fake_request_json)
+    monkeypatch.setattr(export, "EXPORT_BATCH_SIZE", 200)
+    path = tmp_path / f"works.{fmt}"
+
+    with pytest.raises(RuntimeError):
+        export.export_works(requirements(), path, fmt)
+    assert len(read_ids(path, fmt)) == 400
+    leave_partial_batch(path, fmt)
+
+    assert export.export_works(requirements(), path, fmt) == TOTAL
+    assert read_ids(path, fmt) == [
+        work["id"] for work in openalex.process_results(works)
+    ]
+    assert not os.path.exists(f"{path}.checkpoint.json")
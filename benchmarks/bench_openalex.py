@@ -0,0 +1,339 @@
+"""Benchmarks for the OpenAlex search pipeline"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from conftest import load_fixture, reset_caches, tile_works
+
+pytest.importorskip("pytest_benchmark")
+
+# pylint: disable=wrong-import-position,wrong-import-order
+import citation_graph
+import openalex
+import topic_recommender
+from query_fanout import reciprocal_rank_fusion
+from response_cache import ResponseCache
+from requirements_store import (
+    get_requirements_store,
+    initialise_requirements_dictionary,
+)
+from tool_output import encode_works
+from topic_prefetch import get_session_prefetcher
+from works_pager import WorksPager
+from works_store import WorksStore
+
+SESSION_ID = "benchmark"
+
+
+def requirements(topic_id=""):
+    """Returns a requirements dictionary for a filtered keyword search."""
+    user_requirements = initialise_requirements_dictionary()
+    user_requirements["keywords"] = ["hydrogen", "storage"]
+    user_requirements["sort_by"] = "cited_by_count"
+    user_requirements["filters"].update(
+        {
+            "primary_topic_id": topic_id,
+            "author_id": "A5023888391",
+            "from_publication_year": 2015,
+            "to_publication_year": 2024,
+        }
+    )
+    return user_requirements
+
+
+def test_build_search_url(benchmark):
+    """Composes the filtered, sorted works URL."""
+    user_requirements = requirements("T10030")
+    api_url = benchmark(openalex.build_search_url, user_requirements, 25)
+    assert "primary_topic.id:T10030" in api_url
+
+
+@pytest.mark.parametrize("count", [10, 200, 10_000])
+def test_process_results(benchmark, count):
+    """Normalises raw OpenAlex works into the processed shape."""
+    results = tile_works(load_fixture("works_page.json")["results"], count)
+    works = benchmark(openalex.process_results, results)
+    assert len(works) == count
+
+
+@pytest.mark.parametrize("count", [10, 200])
+def test_encode_works(benchmark, count):
+    """Encodes processed works as the compact tool output."""
+    results = tile_works(load_fixture("works_page.json")["results"], count)
+    works = openalex.process_results(results)
+    assert benchmark(encode_works, works)
+
+
+def test_recommend_topics_local(benchmark, local_topics):
+    """Ranks topics offline with the BM25 recommender."""
+    openalex.get_local_topic_groups("warmup")
+    groups = benchmark(openalex.get_topic_groups, "hydrogen%20storage", False, "local")
+    assert groups
+
+
+def test_stale_recommenders_removed(local_topics, tmp_path, monkeypatch):
+    """Saving the recommender for a new topics file version deletes the
+    ones saved for earlier versions."""
+    stale = tmp_path / "1700000000.0-123"
+    stale.mkdir()
+    (stale / "meta.json").write_text("{}", encoding="utf-8")
+    monkeypatch.setattr(topic_recommender, "_recommender", None)
+    recommender = topic_recommender.get_topic_recommender()
+    assert [path.name for path in tmp_path.iterdir()] == [
+        "{}-{}".format(*recommender.version)
+    ]
+
+
+def test_recommend_topics_remote(benchmark, openalex_replay):
+    """Groups works by topic through a replayed OpenAlex round trip."""
+    groups = benchmark.pedantic(
+        openalex.get_topic_groups,
+        args=("hydrogen%20storage", False, "remote"),
+        setup=reset_caches,
+        rounds=10,
+    )
+    assert len(groups) == 10
+
+
+def test_get_research_papers(benchmark, openalex_replay):
+    """Runs a topic-filtered search from a cold cache."""
+    store = get_requirements_store()
+
+    def setup():
+        reset_caches()
+        store.reset(SESSION_ID)
+        store.update(SESSION_ID, {"filters.primary_topic_id": "T10030"})
+
+    output = benchmark.pedantic(
+        openalex.get_research_papers,
+        args=("hydrogen storage", "relevance_score", False, SESSION_ID),
+        setup=setup,
+        rounds=10,
+    )
+    assert output.startswith('{"columns"')
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["cold", "warm"])
+def test_update_user_requirements(benchmark, openalex_replay, cached):
+    """Selects a topic: validates its ID and runs the filtered search."""
+    store = get_requirements_store()
+
+    def setup():
+        if not cached:
+            reset_caches()
+        store.reset(SESSION_ID)
+        store.update(SESSION_ID, {"keywords": ["hydrogen", "storage"]})
+
+    output = benchmark.pedantic(
+        openalex.update_user_requirements,
+        args=("primary_topic_id", "T10030", SESSION_ID),
+        setup=setup,
+        rounds=10,
+    )
+    assert output.startswith('{"columns"')
+
+
+def test_fanout_search(benchmark, openalex_replay):
+    """Runs a six-keyword relevance search as fused keyword variants."""
+    user_requirements = requirements("T10030")
+    user_requirements["keywords"] += ["metal", "hydride", "kinetics", "magnesium"]
+    user_requirements["sort_by"] = "relevance_score"
+    output, _ = benchmark.pedantic(
+        openalex.run_works_search,
+        args=(user_requirements,),
+        setup=reset_caches,
+        rounds=10,
+    )
+    assert output.startswith('{"columns"')
+
+
+def test_reciprocal_rank_fusion(benchmark):
+    """Fuses four overlapping ranked lists of 200 works."""
+    works = tile_works(load_fixture("works_page.json")["results"], 500)
+    for i, work in enumerate(works):
+        work["doi"] = f"https://doi.org/10.5555/{i}"
+    ranked_lists = [works[start : start + 200] for start in range(0, 400, 100)]
+    fused, _ = benchmark(reciprocal_rank_fusion, ranked_lists)
+    assert len(fused) == 500
+
+
+def test_get_work_details(benchmark, openalex_replay):
+    """Fetches and normalises the full record of one work."""
+    details = benchmark.pedantic(
+        openalex.get_work_details,
+        args=("W2100837269",),
+        setup=reset_caches,
+        rounds=10,
+    )
+    assert details["id"] == "W2100837269"
+
+
+@pytest.mark.parametrize("count", [5, 120])
+def test_get_works_details(benchmark, openalex_replay, count):
+    """Resolves many works with batched, concurrent ID-filter lookups."""
+    work_ids = [f"W{2 * 10**9 + i}" for i in range(count)]
+    details = benchmark.pedantic(
+        openalex.get_works_details, args=(work_ids,), setup=reset_caches, rounds=10
+    )
+    assert [work["id"] for work in details] == work_ids
+
+
+@pytest.mark.parametrize("depth", [1, 2])
+def test_expand_citation_graph(benchmark, openalex_replay, depth):
+    """Expands the citation graph around two works and ranks it."""
+    graph = benchmark.pedantic(
+        citation_graph.get_citation_graph,
+        args=(["W2100837269", "W2041540760"], depth, "both"),
+        setup=reset_caches,
+        rounds=5,
+    )
+    assert graph["works"]
+
+
+@pytest.fixture(scope="module")
+def works_store():
+    """A works store holding 5,000 works with abstracts."""
+    store = WorksStore(":memory:")
+    store.add(tile_works([load_fixture("work.json")], 5000))
+    return store
+
+
+def test_store_works(benchmark):
+    """Upserts a page of 200 works into the full-text works store."""
+    store = WorksStore(":memory:")
+    results = tile_works([load_fixture("work.json")], 200)
+    benchmark(store.add, results)
+    assert len(store) == 200
+
+
+@pytest.mark.parametrize("author", ["", "Sato"], ids=["text", "text+author"])
+def test_search_stored_works(benchmark, works_store, author):
+    """Answers a follow-up question from the local works store."""
+    works = benchmark(works_store.search, "magnesium hydride", author)
+    assert works
+
+
+def test_fanout_pages_past_fused_list(monkeypatch):
+    """Paging a fan-out search continues the all-keywords search once the
+    fused list is used up, without repeating works already shown."""
+    total = 60
+
+    def fake_request_json(api_url):
+        query = {
+            key: values[0] for key, values in parse_qs(urlsplit(api_url).query).items()
+        }
+        cursor = query["cursor"]
+        start = 0 if cursor == "*" else int(cursor)
+        # Subset variants rank works 10-34 first; the all-keywords one 0-24
+        if len(query["search"].split()) < 6 and cursor == "*":
+            start = 10
+        works = tile_works(load_fixture("works_page.json")["results"], total)
+        for i, work in enumerate(works):
+            work["doi"] = f"https://doi.org/10.5555/{i}"
+        page = works[start : start + 25]
+        next_start = start + len(page)
+        return {
+            "meta": {"next_cursor": str(next_start) if next_start < total else None},
+            "results": page,
+        }
+
+    monkeypatch.setattr(openalex, "request_json", fake_request_json)
+    reset_caches()
+    user_requirements = requirements()
+    user_requirements["keywords"] += ["metal", "hydride", "kinetics", "magnesium"]
+    user_requirements["sort_by"] = "relevance_score"
+    _, fetch_page = openalex.build_page_fetcher(user_requirements)
+
+    pager = WorksPager(fetch_page, executor=ThreadPoolExecutor(max_workers=1))
+    ids = [work["id"] for works in pager for work in works]
+    assert len(ids) == len(set(ids)) == total
+    reset_caches()
+
+
+def test_topic_prefetch_budget(openalex_replay, monkeypatch):
+    """Speculative topic searches are charged every request they send,
+    one per keyword variant when the search fans out."""
+    monkeypatch.setattr(openalex, "TOPIC_RECOMMENDER_MODE", "remote")
+    user_requirements = requirements()
+    user_requirements["keywords"] += ["metal", "hydride", "kinetics", "magnesium"]
+    user_requirements["sort_by"] = "relevance_score"
+    session_id = "prefetch-budget"
+    openalex.run_works_search(user_requirements, session_id)
+    prefetcher = get_session_prefetcher(session_id)
+    for api_url in list(prefetcher._searches):  # pylint: disable=protected-access
+        prefetcher.take(api_url).result()
+    # Every request but the group_by that recommended the topics
+    assert prefetcher.requests_made == openalex_replay.requests - 1 > 3
+    prefetcher.close()
+
+
+def test_only_returned_works_are_stored(openalex_replay, monkeypatch):
+    """The works store gets the pages returned to the model, not the
+    topic prefetches or the pager's next-page prefetch."""
+    recorded = []
+    monkeypatch.setattr(openalex, "record_works", recorded.append)
+    monkeypatch.setattr(openalex, "TOPIC_RECOMMENDER_MODE", "remote")
+    session_id = "seen-works"
+    get_requirements_store().reset(session_id)
+
+    openalex.get_research_papers(
+        "hydrogen storage", "relevance_score", False, session_id
+    )
+    prefetcher = get_session_prefetcher(session_id)
+    for api_url in list(prefetcher._searches):  # pylint: disable=protected-access
+        prefetcher.take(api_url).result()
+    assert not recorded
+
+    openalex.update_user_requirements("primary_topic_id", "T10030", session_id)
+    assert [len(works) for works in recorded] == [openalex.RESULTS_PER_PAGE]
+    openalex.get_more_research_papers(session_id)
+    assert [len(works) for works in recorded] == [openalex.RESULTS_PER_PAGE] * 2
+
+
+def test_response_cache_prunes_sqlite(tmp_path):
+    """Writes reach SQLite in the background, expired rows are dropped and
+    the rows kept never exceed max_rows."""
+    db_path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(maxsize=2, db_path=db_path, max_rows=3)
+    cache.set("expired", {"results": []}, ttl=-1)
+    for i in range(5):
+        cache.set(f"works-{i}", {"results": [i]}, ttl=60 + i)
+    cache.flush()
+
+    reopened = ResponseCache(maxsize=2, db_path=db_path, max_rows=3)
+    assert reopened.get("expired") is None
+    assert reopened.get("works-0") is None
+    assert [reopened.get(f"works-{i}") for i in range(2, 5)] == [
+        {"results": [2]},
+        {"results": [3]},
+        {"results": [4]},
+    ]
+
+
+def test_invalid_id_leaves_session_alone(openalex_replay, monkeypatch):
+    """The search run while an ID is validated has no session side effects,
+    so an invalid ID neither uses the session's prefetches nor its pager."""
+    taken = []
+    searched = threading.Event()
+    take_prefetched_search = openalex.take_prefetched_search
+
+    def record_take(session_id, api_url):
+        taken.append(session_id)
+        searched.set()
+        return take_prefetched_search(session_id, api_url)
+
+    monkeypatch.setattr(openalex, "take_prefetched_search", record_take)
+    monkeypatch.setattr(
+        openalex, "validate_entity", lambda api_url, entity_id: not searched.wait(5)
+    )
+    session_id = "invalid-id"
+    get_requirements_store().reset(session_id)
+    get_requirements_store().update(session_id, {"filters.primary_topic_id": "T10030"})
+
+    output = openalex.update_user_requirements("author_id", "A9999999999", session_id)
+    assert output == "❌ Invalid ID or API fetch failed."
+    assert taken == [None]
+    assert openalex.get_session_pager(session_id) is None
@@ -0,0 +1,181 @@
+"""Benchmarks for the async OpenAlex client, driven through httpx.MockTransport"""
+
+import asyncio
+
+import pytest
+
+from conftest import reset_caches
+
+pytest.importorskip("pytest_benchmark")
+
+# pylint: disable=wrong-import-position,wrong-import-order
+import httpx
+import openalex_async
+from requirements_store import get_requirements_store
+
+SESSION_ID = "benchmark-async"
+WORKS_URL = "https://api.openalex.org/works?filter=doi:10.1/x"
+
+
+def use_transport(monkeypatch, handler):
+    """Routes the async client of every event loop through handler."""
+    resources = {}
+
+    def get_async_client():
+        loop = asyncio.get_running_loop()
+        if loop not in resources:
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            resources[loop] = (client, asyncio.Semaphore(4))
+        return resources[loop]
+
+    monkeypatch.setattr(openalex_async, "get_async_client", get_async_client)
+
+
+def replay_handler(replay):
+    """Answers async requests from the synchronous OpenAlex replay."""
+
+    def handler(request):
+        if request.url.path == "/authors/A404":
+            return httpx.Response(404, json={"error": "Not found"})
+        return httpx.Response(200, json=replay(str(request.url)))
+
+    return handler
+
+
+def scripted_handler(responses):
+    """Answers requests with the scripted responses or exceptions, in order."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        response = responses[len(requests) - 1]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    return handler, requests
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records the retry delays slept instead of waiting them out."""
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record_sleep(delay):
+        delays.append(delay)
+        await sleep(0)
+
+    monkeypatch.setattr(openalex_async.asyncio, "sleep", record_sleep)
+    monkeypatch.setattr(openalex_async, "BACKOFF_FACTOR", 0.25)
+    reset_caches()
+    yield delays
+    reset_caches()
+
+
+def test_retry_after_and_backoff(monkeypatch, sleeps):
+    """429 and 5xx responses are retried, waiting Retry-After when given
+    and exponential backoff otherwise."""
+    handler, requests = scripted_handler(
+        [
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(503),
+            httpx.Response(200, json={"results": [{"id": "W1"}]}),
+        ]
+    )
+    use_transport(monkeypatch, handler)
+    results = asyncio.run(openalex_async.fetch_data_async(WORKS_URL))
+    assert results == [{"id": "W1"}]
+    assert len(requests) == 3
+    assert sleeps == [2.0, 0.25 * 2]
+
+
+def test_transport_errors_retried(monkeypatch, sleeps):
+    """Dropped connections and timeouts are retried with backoff."""
+    handler, requests = scripted_handler(
+        [
+            httpx.ConnectError("connection refused"),
+            httpx.ReadTimeout("timed out"),
+            httpx.Response(200, json={"results": []}),
+        ]
+    )
+    use_transport(monkeypatch, handler)
+    assert asyncio.run(openalex_async.fetch_data_async(WORKS_URL)) == []
+    assert len(requests) == 3
+    assert sleeps == [0.25, 0.25 * 2]
+
+
+def test_gives_up_after_max_retries(monkeypatch, sleeps):
+    """After MAX_RETRIES retries the error is logged and None returned."""
+    attempts = openalex_async.MAX_RETRIES + 1
+    handler, requests = scripted_handler(
+        [httpx.ConnectError("connection refused")] * (attempts - 1)
+        + [httpx.Response(500)]
+    )
+    use_transport(monkeypatch, handler)
+    assert asyncio.run(openalex_async.fetch_data_async(WORKS_URL)) is None
+    assert len(requests) == attempts
+    assert len(sleeps) == attempts - 1
+
+
+def test_get_research_papers_async(benchmark, openalex_replay, monkeypatch):
+    """Runs a topic-filtered search on the event loop from a cold cache."""
+    use_transport(monkeypatch, replay_handler(openalex_replay))
+    store = get_requirements_store()
+
+    def setup():
+        reset_caches()
+        store.reset(SESSION_ID)
+        store.update(SESSION_ID, {"filters.primary_topic_id": "T10030"})
+
+    def search():
+        return asyncio.run(
+            openalex_async.get_research_papers_async(
+                "hydrogen storage", "relevance_score", False, SESSION_ID
+            )
+        )
+
+    output = benchmark.pedantic(search, setup=setup, rounds=5)
+    assert output.startswith('{"columns"')
+
+
+@pytest.mark.parametrize(
+    "key, value, expected",
+    [
+        ("primary_topic_id", "T10030", '{"columns"'),
+        ("author_id", "A404", "❌ Invalid ID or API fetch failed."),
+        ("primary_topic_id", "X1", "❌ Update failed."),
+        ("primary_topic_id", "", "❌ Update failed."),
+        ("from_publication_year", "19x", "❌ Invalid year format."),
+        ("to_publication_year", "1700", "❌ Year is out of valid range."),
+        ("from_publication_year", "2015", '{"columns"'),
+        ("unknown", "1", "❌ Invalid key."),
+    ],
+)
+def test_update_user_requirements_async(
+    openalex_replay, monkeypatch, key, value, expected
+):
+    """Each async update validates its value and answers like the sync one."""
+    use_transport(monkeypatch, replay_handler(openalex_replay))
+    store = get_requirements_store()
+    store.reset(SESSION_ID)
+    store.update(
+        SESSION_ID,
+        {"keywords": ["hydrogen", "storage"], "filters.primary_topic_id": "T10030"},
+    )
+    output = asyncio.run(
+        openalex_async.update_user_requirements_async(key, value, SESSION_ID)
+    )
+    assert str(output).startswith(expected)
+
+
+def test_update_doi_async(openalex_replay, monkeypatch):
+    """A DOI is validated against OpenAlex and saved with its doi.org prefix."""
+    use_transport(monkeypatch, replay_handler(openalex_replay))
+    get_requirements_store().reset(SESSION_ID)
+    output = asyncio.run(
+        openalex_async.update_user_requirements_async("doi", "10.1/x", SESSION_ID)
+    )
+    assert output
+    filters = get_requirements_store().get(SESSION_ID)["filters"]
+    assert filters["doi"] == "https://doi.org/10.1/x"
@@ -0,0 +1,137 @@
+"""Benchmarks for the OpenAlex rate limiter and request coalescing"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from rate_limiter import BACKGROUND, INTERACTIVE, PriorityRateLimiter
+from single_flight import SingleFlight
+
+WAITERS = 8
+
+
+def wait_until(condition, timeout=5):
+    """Polls condition until it holds, failing the test after timeout."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def start_thread(target, *args):
+    """Starts a daemon thread running target(*args)."""
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_acquire_uncontended(benchmark):
+    """Overhead of taking a token when the bucket is never empty."""
+    limiter = PriorityRateLimiter(rate=1e9, burst=1000)
+    benchmark(limiter.acquire, INTERACTIVE)
+
+
+def test_interactive_served_before_background():
+    """Under contention, interactive requests go ahead of background ones
+    that were queued earlier, and each priority keeps arrival order."""
+    limiter = PriorityRateLimiter(rate=50, burst=1)
+    limiter.acquire(INTERACTIVE)
+    served = []
+
+    def request(name, priority):
+        limiter.acquire(priority)
+        served.append(name)
+
+    threads = []
+    for i in range(3):
+        threads.append(start_thread(request, f"background-{i}", BACKGROUND))
+        wait_until(lambda i=i: limiter.metrics()["background"]["queue_depth"] == i + 1)
+    for i in range(3):
+        threads.append(start_thread(request, f"interactive-{i}", INTERACTIVE))
+        wait_until(lambda i=i: limiter.metrics()["interactive"]["queue_depth"] == i + 1)
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert served == [
+        "interactive-0",
+        "interactive-1",
+        "interactive-2",
+        "background-0",
+        "background-1",
+        "background-2",
+    ]
+    metrics = limiter.metrics()
+    assert metrics["interactive"]["requests"] == 4
+    assert metrics["interactive"]["max_queue_depth"] == 3
+    assert metrics["background"]["requests"] == 3
+    assert metrics["background"]["max_queue_depth"] == 3
+    assert metrics["interactive"]["queue_depth"] == 0
+    assert metrics["background"]["queue_depth"] == 0
+    assert metrics["background"]["max_wait_ms"] > metrics["interactive"]["max_wait_ms"]
+
+
+def test_single_flight_shares_leader_error():
+    """Callers coalesced onto a failing call all receive its exception,
+    and the next call with the same key runs again."""
+    flight = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def failing_call():
+        release.wait(5)
+        raise ValueError("OpenAlex is down")
+
+    def call():
+        try:
+            flight.do("works", failing_call)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [start_thread(call)]
+    wait_until(lambda: flight.metrics()["in_flight"] == 1)
+    threads += [start_thread(call) for _ in range(WAITERS)]
+    wait_until(lambda: flight.metrics()["coalesced"] == WAITERS)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(errors) == WAITERS + 1
+    assert all(e is errors[0] for e in errors)
+    assert flight.metrics() == {
+        "in_flight": 0,
+        "requests": 1,
+        "coalesced": WAITERS,
+    }
+    assert flight.do("works", lambda: "ok") == ("ok", False)
+    assert flight.metrics()["requests"] == 2
+
+
+def test_single_flight_shares_leader_result():
+    """Coalesced callers get the leader's result with shared=True."""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls, results = [], []
+
+    def slow_call():
+        calls.append(1)
+        release.wait(5)
+        return {"results": []}
+
+    threads = [start_thread(lambda: results.append(flight.do("works", slow_call)))]
+    wait_until(lambda: flight.metrics()["in_flight"] == 1)
+    threads += [
+        start_thread(lambda: results.append(flight.do("works", slow_call)))
+        for _ in range(WAITERS)
+    ]
+    wait_until(lambda: flight.metrics()["coalesced"] == WAITERS)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * WAITERS
+    assert all(result == {"results": []} for result, _ in results)
@@ -0,0 +1,85 @@
+"""Benchmarks for concurrent sessions sharing one requirements store"""
+
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+
+import pytest
+
+from requirements_store import (
+    InMemoryRequirementsStore,
+    RequirementsStore,
+    SQLiteRequirementsStore,
+)
+
+SESSIONS = 16
+UPDATES_PER_SESSION = 50
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Each requirements store implementation, empty."""
+    if request.param == "sqlite":
+        return SQLiteRequirementsStore(str(tmp_path / "requirements.sqlite"))
+    return InMemoryRequirementsStore(max_sessions=SESSIONS)
+
+
+def run_session(store, session_id):
+    """Updates one session's fields repeatedly, reading them back each time.
+    Every value names the session, so a value from another session shows
+    up as a mismatch."""
+    store.reset(session_id)
+    for i in range(UPDATES_PER_SESSION):
+        store.update(
+            session_id,
+            {
+                "keywords": [session_id, str(i)],
+                "filters.author_id": session_id,
+                "filters.from_publication_year": i,
+            },
+        )
+        user_requirements = store.get(session_id)
+        assert user_requirements["keywords"] == [session_id, str(i)]
+        assert user_requirements["filters"]["author_id"] == session_id
+        assert user_requirements["filters"]["from_publication_year"] == i
+    return store.get(session_id)
+
+
+def run_sessions(store):
+    """Runs every session on its own thread at once."""
+    session_ids = [f"session-{n}" for n in range(SESSIONS)]
+    with ThreadPoolExecutor(max_workers=SESSIONS) as executor:
+        results = list(executor.map(lambda s: run_session(store, s), session_ids))
+    return dict(zip(session_ids, results))
+
+
+def check_sessions(store, results):
+    """Asserts that every session ended with its own last update."""
+    for session_id, user_requirements in results.items():
+        assert user_requirements["keywords"] == [
+            session_id,
+            str(UPDATES_PER_SESSION - 1),
+        ]
+        assert user_requirements["filters"]["author_id"] == session_id
+        assert user_requirements["filters"]["doi"] == ""
+        assert user_requirements["sort_by"] == "relevance_score"
+        assert store.get(session_id) == user_requirements
+
+
+def test_concurrent_sessions(store):
+    """Concurrent updates from many sessions never bleed into each other.
+    Runs without pytest-benchmark, as it checks correctness only."""
+    check_sessions(store, run_sessions(store))
+
+
+@pytest.mark.skipif(
+    find_spec("pytest_benchmark") is None, reason="pytest-benchmark not installed"
+)
+def test_concurrent_sessions_timed(benchmark, store):
+    """Times all sessions updating the store at once."""
+    check_sessions(store, benchmark.pedantic(run_sessions, args=(store,), rounds=3))
+
+
+def test_store_is_abstract():
+    """The base class cannot be used without the three operations."""
+    with pytest.raises(TypeError):
+        RequirementsStore()  # pylint: disable=abstract-class-instantiated
@@ -0,0 +1,58 @@
+"""Benchmarks for app start-up and Streamlit rerun overhead"""
+
+import ast
+import subprocess
+import sys
+
+import pytest
+
+from conftest import BENCHMARKS_DIR
+
+pytest.importorskip("pytest_benchmark")
+
+SRC_DIR = BENCHMARKS_DIR.parent / "src"
+MAIN_SCRIPT = SRC_DIR / "main.py"
+
+
+def get_main_imports():
+    """Returns the modules main.py imports at the top level, i.e. everything
+    loaded before the first page can render."""
+    tree = ast.parse(MAIN_SCRIPT.read_text(encoding="utf-8"))
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+APP_MODULES = ", ".join(get_main_imports())
+
+
+def import_app_modules():
+    """Imports the app modules in a fresh interpreter."""
+    subprocess.run(
+        [sys.executable, "-c", f"import {APP_MODULES}"],
+        cwd=SRC_DIR,
+        check=True,
+    )
+
+
+def test_import_cold(benchmark):
+    """Cold start: importing the app modules in a new process."""
+    benchmark.pedantic(import_app_modules, rounds=5)
+
+
+def test_interpreter_baseline(benchmark):
+    """A bare interpreter start, to subtract from the cold import time."""
+    benchmark.pedantic(subprocess.run, args=([sys.executable, "-c", "pass"],), rounds=5)
+
+
+def test_streamlit_rerun(benchmark):
+    """Per-rerun overhead: one run of main.py with warm module imports."""
+    testing = pytest.importorskip("streamlit.testing.v1")
+    app = testing.AppTest.from_file(str(MAIN_SCRIPT), default_timeout=30)
+    app.run()
+    benchmark.pedantic(app.run, rounds=10)
+    assert not app.exception
@@ -0,0 +1,277 @@
+"""Shared fixtures for the offline benchmark suite.
+
+OpenAlex is replaced by a replay of the recorded responses in fixtures/,
+and the OpenAI client by a scripted stub, so every benchmark runs without
+network access. Latency is injected into both to model real round trips.
+"""
+
+import copy
+import csv
+import json
+import os
+import random
+import re
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCHMARKS_DIR / "fixtures"
+RESULTS_DIR = BENCHMARKS_DIR / ".results"
+
+# Keep every store in memory and never talk to the real APIs
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ["OPENALEX_CACHE_PATH"] = ""
+os.environ["REQUIREMENTS_STORE"] = "memory"
+os.environ["WORKS_STORE_PATH"] = ":memory:"
+os.environ["LLM_CACHE"] = "off"
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "src"))
+
+# Injected round-trip latencies, in milliseconds
+OPENALEX_LATENCY_MS = float(os.getenv("BENCH_OPENALEX_LATENCY_MS", "20"))
+OPENAI_LATENCY_MS = float(os.getenv("BENCH_OPENAI_LATENCY_MS", "50"))
+# Roughly the number of topics in OpenAlex
+TOPIC_COUNT = int(os.getenv("BENCH_TOPIC_COUNT", "4500"))
+
+
+def pytest_configure(config):
+    """Stores benchmark runs under benchmarks/.results for comparison."""
+    if config.pluginmanager.hasplugin("benchmark"):
+        if config.getoption("benchmark_storage") == "file://./.benchmarks":
+            config.option.benchmark_storage = f"file://{RESULTS_DIR}"
+
+
+def load_fixture(name):
+    """Returns a recorded OpenAlex response from fixtures/."""
+    with open(FIXTURES_DIR / name, "r", encoding="utf-8") as fs:
+        return json.load(fs)
+
+
+def tile_works(results, count):
+    """Repeats recorded works up to count, giving every copy a unique ID."""
+    works = []
+    for i in range(count):
+        work = copy.deepcopy(results[i % len(results)])
+        work["id"] = f"https://openalex.org/W{9 * 10**9 + i}"
+        works.append(work)
+    return works
+
+
+class ReplayOpenAlex:
+    """Stands in for openalex_client.request_json, answering every URL with
+    the recorded response of the same kind after the injected latency."""
+
+    def __init__(self, latency_ms=OPENALEX_LATENCY_MS, total=1000):
+        self.latency = latency_ms / 1000
+        self.total = total
+        self.requests = 0
+        self.works_page = load_fixture("works_page.json")
+        self.work = load_fixture("work.json")
+        self.group_by = load_fixture("group_by.json")
+        self.topic = load_fixture("topic.json")
+
+    def __call__(self, api_url):
+        self.requests += 1
+        time.sleep(self.latency)
+        parts = urlsplit(api_url)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        path = parts.path.strip("/").split("/")
+
+        if len(path) == 2:
+            entity = self.topic if path[0] == "topics" else self.work
+            return {**entity, "id": f"https://openalex.org/{path[1].upper()}"}
+        if "group_by" in query:
+            return self.group_by
+        lookup = re.match(r"(ids\.openalex|doi):([^,]+)$", query.get("filter", ""))
+        if lookup and "search" not in query:
+            return self.lookup_page(*lookup.groups())
+        return self.search_page(query)
+
+    def lookup_page(self, field, values):
+        """Returns the recorded work once for every ID or DOI looked up."""
+        results = []
+        for value in values.split("|"):
+            work = {**self.work}
+            if field == "doi":
+                work["doi"] = f"https://doi.org/{value}"
+            else:
+                work["id"] = f"https://openalex.org/{value}"
+            results.append(work)
+        return {"meta": {"count": len(results)}, "results": results, "group_by": []}
+
+    def search_page(self, query):
+        """Returns one page of a works search, honouring per_page and cursor."""
+        per_page = int(query.get("per_page", 25))
+        cursor = query.get("cursor")
+        start = int(cursor) if cursor and cursor != "*" else 0
+        count = max(min(per_page, self.total - start), 0)
+        next_start = start + count
+        return {
+            "meta": {
+                **self.works_page["meta"],
+                "count": self.total,
+                "per_page": per_page,
+                "next_cursor": (
+                    str(next_start) if cursor and next_start < self.total else None
+                ),
+            },
+            "results": tile_works(self.works_page["results"], count),
+            "group_by": [],
+        }
+
+
+def reset_caches():
+    """Empties the process-wide caches so every round hits the replay."""
+    # pylint: disable=import-outside-toplevel,protected-access
+    import openalex
+    from response_cache import get_response_cache
+
+    get_response_cache().clear()
+    with openalex._validated_entities_lock:
+        openalex._validated_entities.clear()
+
+
+@pytest.fixture
+def openalex_replay(monkeypatch):
+    """Routes every OpenAlex request through a ReplayOpenAlex."""
+    import openalex  # pylint: disable=import-outside-toplevel
+
+    replay = ReplayOpenAlex()
+    monkeypatch.setattr(openalex, "request_json", replay)
+    reset_caches()
+    yield replay
+    reset_caches()
+
+
+@pytest.fixture(scope="session")
+def topics_csv(tmp_path_factory):
+    """Writes a topics_mapping.csv of TOPIC_COUNT topics shaped like the
+    recorded topic, with names and keywords drawn from a fixed vocabulary."""
+    # pylint: disable=import-outside-toplevel
+    from openalex import process_topics
+
+    rng = random.Random(0)
+    template = load_fixture("topic.json")
+    vocabulary = sorted(
+        {
+            word.strip(",.:").lower()
+            for text in [template["description"], *template["keywords"]]
+            for word in text.split()
+        }
+        | {f"term{i}" for i in range(3000)}
+    )
+    topics = []
+    for i in range(TOPIC_COUNT):
+        words = rng.sample(vocabulary, 12)
+        topics.append(
+            {
+                **template,
+                "id": f"https://openalex.org/T{10000 + i}",
+                "display_name": " ".join(words[:4]).title(),
+                "keywords": words[4:9],
+                "description": f"This cluster of papers focuses on {' '.join(words)}.",
+            }
+        )
+
+    rows = process_topics(topics)
+    path = tmp_path_factory.mktemp("topics") / "topics_mapping.csv"
+    with open(path, "w", newline="", encoding="utf-8") as fs:
+        writer = csv.DictWriter(fs, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+@pytest.fixture
+def local_topics(monkeypatch, topics_csv, tmp_path):
+    """Points the topic index and recommender at the benchmark topics file."""
+    # pylint: disable=import-outside-toplevel
+    import openalex
+    import topic_recommender
+    from topic_index import get_topic_index
+
+    index = partial(get_topic_index, topics_csv)
+    monkeypatch.setattr(openalex, "get_topic_index", index)
+    monkeypatch.setattr(topic_recommender, "get_topic_index", index)
+    monkeypatch.setattr(topic_recommender, "CACHE_DIR", tmp_path)
+    return topics_csv
+
+
+def function_call(name, arguments, call_id):
+    """Builds a function_call output item of a Responses API response."""
+    return SimpleNamespace(
+        type="function_call",
+        id=f"fc_{call_id}",
+        call_id=call_id,
+        name=name,
+        arguments=json.dumps(arguments),
+    )
+
+
+def message(text):
+    """Builds a message output item of a Responses API response."""
+    return SimpleNamespace(
+        type="message", content=[SimpleNamespace(type="output_text", text=text)]
+    )
+
+
+class StubResponses:
+    """Stands in for client.responses, replaying a script of model turns.
+    Each turn is a list of output items; the script restarts once used up,
+    so a benchmark can repeat the same conversation every round."""
+
+    def __init__(self, script, latency_ms=OPENAI_LATENCY_MS):
+        self.script = script
+        self.latency = latency_ms / 1000
+        self.requests = 0
+
+    def create(self, **kwargs):
+        """Returns the next scripted response, streamed if requested."""
+        output = self.script[self.requests % len(self.script)]
+        self.requests += 1
+        time.sleep(self.latency)
+        text = "".join(
+            item.content[0].text for item in output if item.type == "message"
+        )
+        response = SimpleNamespace(
+            id=f"resp_{self.requests}",
+            output=output,
+            output_text=text,
+            usage=SimpleNamespace(input_tokens=1000, output_tokens=100),
+        )
+        if kwargs.get("stream"):
+            return self.stream(response)
+        return response
+
+    @staticmethod
+    def stream(response):
+        """Yields the events of a streamed response."""
+        for item in response.output:
+            if item.type == "message":
+                for word in item.content[0].text.split(" "):
+                    yield SimpleNamespace(
+                        type="response.output_text.delta", delta=f"{word} "
+                    )
+            else:
+                yield SimpleNamespace(type="response.output_item.done", item=item)
+        yield SimpleNamespace(type="response.completed", response=response)
+
+
+@pytest.fixture
+def openai_stub(monkeypatch):
+    """Replaces the OpenAI client used by chat with a scripted stub.
+    Call the returned function with a script to install it."""
+    import chat  # pylint: disable=import-outside-toplevel
+
+    def install(script):
+        responses = StubResponses(script)
+        client = SimpleNamespace(responses=responses)
+        monkeypatch.setattr(chat, "get_openai_client", lambda: client)
+        return responses
+
+    return install
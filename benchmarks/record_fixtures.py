@@ -0,0 +1,48 @@
+"""Records the OpenAlex responses replayed by the benchmark suite.
+
+Run from the repository root on a machine with network access:
+
+    python benchmarks/record_fixtures.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(FIXTURES_DIR.parents[1] / "src"))
+
+# pylint: disable=wrong-import-position
+from openalex import construct_group_by_api_url, construct_sort_by_api_url
+from openalex_client import request_json
+
+KEYWORDS_QUERY = "hydrogen%20storage"
+TOPIC_ID = "T10030"
+
+
+def record(name, api_url):
+    """Fetches an OpenAlex URL and writes its JSON body to fixtures/name."""
+    data = request_json(api_url)
+    with open(FIXTURES_DIR / name, "w", encoding="utf-8") as fs:
+        json.dump(data, fs, ensure_ascii=False)
+    print(f"📼 Recorded {name} from {api_url}")
+    return data
+
+
+def main():
+    """Records one response of every kind the benchmarks replay."""
+    works_url = construct_sort_by_api_url(
+        KEYWORDS_QUERY, {"primary_topic_id": TOPIC_ID}, "relevance_score", False, 25
+    )
+    page = record("works_page.json", f"{works_url}&cursor=*")
+    work_id = page["results"][0]["id"].rsplit("/", 1)[-1]
+    record("work.json", f"https://api.openalex.org/works/{work_id}")
+    record(
+        "group_by.json",
+        construct_group_by_api_url(KEYWORDS_QUERY, "primary_topic.id", False),
+    )
+    record("topic.json", f"https://api.openalex.org/topics/{TOPIC_ID}")
+
+
+if __name__ == "__main__":
+    main()
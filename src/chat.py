@@ -2,21 +2,70 @@
 
 import os
 import json
-from openai import OpenAI
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from openalex import get_research_papers, update_user_requirements
+from openalex import (
+    get_more_research_papers,
+    get_research_papers,
+    get_works_details,
+    update_user_requirements,
+)
 from constants import SAIRA_DEVELOPER_MESSAGE, TOOLS
+from tool_output import encode_json
+from tracing import bind_context, span
+from works_store import search_stored_works
+from llm_cache import (
+    LLM_CACHE_TTL,
+    build_cache_key,
+    dump_response,
+    get_llm_cache,
+    is_cacheable,
+    load_response,
+    record_stream,
+    replay_stream,
+)
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Set your OpenAI API key
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+
+OPENAI_MODEL = "gpt-4o-mini"
+OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.5"))
+
+# Model round trips allowed after tool calls within a single user turn
+MAX_TOOL_STEPS = int(os.getenv("MAX_TOOL_STEPS", "5"))
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "4"))
+# Tools that change the session's requirements run one at a time, in order,
+# before any other tool calls from the same response
+SERIAL_TOOLS = {"update_user_requirements"}
+
+tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS)
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+
+def get_openai_client():
+    """Returns the process-wide OpenAI client, creating it on first use.
+    The openai package is imported here so it stays out of app start-up."""
+    global _openai_client  # pylint: disable=global-statement
+    if _openai_client is None:
+        with _openai_client_lock:
+            if _openai_client is None:
+                from openai import OpenAI  # pylint: disable=import-outside-toplevel
+
+                _openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    return _openai_client
 
 
 def initialise_converstation():
     """Generates the Instructions to initiate the conversation."""
-    print("🟢 Initialising conversation...")
+    logger.info("🟢 Initialising conversation...")
     messages = [{"role": "system", "content": SAIRA_DEVELOPER_MESSAGE}]
     return messages
 
@@ -92,126 +141,284 @@ def initialise_converstation():
 #     return messages
 
 
-def get_chat_responses(messages):
-    """Get Chat Responses from OpenAI"""
-    print("🟢 Starting chat response process...")
-    response = openai_client.responses.create(
-        model="gpt-4o-mini", input=messages, tools=TOOLS, temperature=0.5, store=True
+def create_response(messages, context=None, cache=False, **kwargs):
+    """Sends the conversation to the OpenAI Responses API.
+    With a ConversationContext, the history is compacted (or chained through
+    previous_response_id) before sending, and non-streamed responses are
+    recorded on the context. With cache=True, a response to an identical
+    request is served from the model response cache when the temperature
+    allows it, and new responses are added to it."""
+    request = context.prepare(messages) if context else {"input": messages}
+    stream = kwargs.pop("stream", False)
+    cache_key = None
+    if cache and is_cacheable(OPENAI_TEMPERATURE):
+        cache_key = build_cache_key(
+            OPENAI_MODEL, TOOLS, OPENAI_TEMPERATURE, {**request, **kwargs}
+        )
+    with span(
+        "llm.request",
+        model=OPENAI_MODEL,
+        stream=stream,
+        items_sent=len(request["input"]),
+    ) as llm_span:
+        cached = get_llm_cache().get(cache_key) if cache_key else None
+        llm_span.set(cache_hit=cached is not None)
+        if cached is not None:
+            logger.info("⚡ Served model response from cache.")
+            response = load_response(cached)
+        else:
+            response = get_openai_client().responses.create(
+                model=OPENAI_MODEL,
+                tools=TOOLS,
+                temperature=OPENAI_TEMPERATURE,
+                store=True,
+                stream=stream,
+                **request,
+                **kwargs,
+            )
+        if cached is None and cache_key and not stream:
+            get_llm_cache().set(cache_key, dump_response(response), LLM_CACHE_TTL)
+        if not stream:
+            set_usage_attributes(llm_span, response)
+    if stream and cached is not None:
+        return replay_stream(response)
+    if stream and cache_key:
+        return record_stream(response, cache_key)
+    if context and not stream:
+        context.record(response)
+    return response
+
+
+def set_usage_attributes(llm_span, response):
+    """Adds the token usage of a model response to a span"""
+    usage = getattr(response, "usage", None)
+    llm_span.set(
+        input_tokens=getattr(usage, "input_tokens", None),
+        output_tokens=getattr(usage, "output_tokens", None),
     )
-    print("🤖 Response from OpenAI model received.")
 
-    if response.output[0].type == "function_call":
-        return handle_function_call(response.output[0], messages)
 
-    print("✅ Response appended to messages.")
+def get_chat_responses(messages, session_id, step_latencies=None, context=None):
+    """Get Chat Responses from OpenAI.
+    Runs every function call in a response, sends all outputs back in one
+    follow-up request and repeats until the model answers in text or
+    MAX_TOOL_STEPS is reached. Per-step timings are appended to
+    step_latencies when a list is given, and a ConversationContext limits
+    the history sent with each request."""
+    logger.info("🟢 Starting chat response process...")
+    started = time.perf_counter()
+    response = create_response(messages, context, cache=True)
+    logger.info("🤖 Response from OpenAI model received.")
+    record_step(step_latencies, 0, started, started, [])
+
+    for step in range(1, MAX_TOOL_STEPS + 1):
+        tool_calls = get_function_calls(response.output)
+        if not tool_calls:
+            break
+        started = time.perf_counter()
+        handle_function_calls(tool_calls, messages, session_id)
+        tools_done = time.perf_counter()
+
+        logger.info("🔁 Sending updated messages back to OpenAI.")
+        final_step = step == MAX_TOOL_STEPS
+        response = create_response(
+            messages,
+            context,
+            cache=True,
+            tool_choice="none" if final_step else "auto",
+        )
+        record_step(step_latencies, step, started, tools_done, tool_calls)
+
+    logger.info("✅ Response appended to messages.")
     messages.append({"role": "assistant", "content": response.output_text})
     return messages
 
 
-def handle_function_call(tool_call, messages):
-    """Handles tool/function calls received from OpenAI model"""
-    print("📡 Detected function call in model response.")
-    args = json.loads(tool_call.arguments)
-    print(f"📦 Function arguments extracted: {args}")
-
-    handler_map = {
-        "get_research_works": handle_get_research_works,
-        "update_user_requirements": handle_update_user_requirements,
-        # Add more function handlers here as needed
-    }
+def get_function_calls(output_items):
+    """Returns every function_call item of a model response"""
+    return [item for item in output_items if item.type == "function_call"]
 
-    if tool_call.name in handler_map:
-        return handler_map[tool_call.name](tool_call, args, messages)
 
-    print("❌ No handler found for the requested function.")
-    messages.append(
+def record_step(step_latencies, step, started, tools_done, tool_calls):
+    """Appends the timing of one agent step to step_latencies"""
+    if step_latencies is None:
+        return
+    finished = time.perf_counter()
+    step_latencies.append(
         {
-            "role": "system",
-            "content": (
-                "❌ Invalid request: The specified function name was not found. "
-                "Please verify the function name and try again."
-            ),
+            "step": step,
+            "tools": [tool_call.name for tool_call in tool_calls],
+            "tool_seconds": round(tools_done - started, 4),
+            "model_seconds": round(finished - tools_done, 4),
         }
     )
-    return messages
+    logger.info("⏱️ Step %s took %.2fs", step, finished - started)
 
 
-def handle_get_research_works(tool_call, args, messages):
-    """Handles the get_research_works function call"""
-    print(f"⚙️ Calling function: {tool_call.name}")
-    works = get_research_papers(
+def run_get_research_works(args, session_id):
+    """Runs the get_research_works tool and returns its output"""
+    return get_research_papers(
         args["keywords"],
         args["sort_by"],
         args["has_open_access"],
+        session_id,
     )
-    print("📄 Function call completed. Appending messages.")
 
-    messages.append(
-        {
-            "type": "function_call",
-            "call_id": tool_call.call_id,
-            "name": tool_call.name,
-            "arguments": tool_call.arguments,
-        }
-    )
 
-    messages.append(
-        {
-            "type": "function_call_output",
-            "call_id": tool_call.call_id,
-            "output": str(works),
-        }
-    )
+def run_update_user_requirements(args, session_id):
+    """Runs the update_user_requirements tool and returns its output"""
+    return update_user_requirements(args["key"], args["value"], session_id)
 
-    print("🔁 Sending updated messages back to OpenAI.")
-    response = openai_client.responses.create(
-        model="gpt-4o-mini",
-        input=messages,
-        tools=TOOLS,
-        temperature=0.5,
-        store=True,
-    )
 
-    print("✅ Updated response appended to messages.")
-    messages.append({"role": "assistant", "content": response.output_text})
-    return messages
+def run_get_work_details(args, session_id):
+    """Runs the get_work_details tool and returns its output"""
+    return encode_json(get_works_details(args["work_ids"]))
 
 
-def handle_update_user_requirements(tool_call, args, messages):
-    """Handles the get_research_works function call"""
-    print(f"⚙️ Calling function: {tool_call.name}")
-    update_response = update_user_requirements(
-        args["key"],
-        args["value"],
-    )
-    print("📄 Function call completed. Appending messages.")
+def run_get_more_research_works(args, session_id):
+    """Runs the get_more_research_works tool and returns its output"""
+    return get_more_research_papers(session_id)
 
-    messages.append(
-        {
-            "type": "function_call",
-            "call_id": tool_call.call_id,
-            "name": tool_call.name,
-            "arguments": tool_call.arguments,
-        }
-    )
 
-    messages.append(
-        {
-            "type": "function_call_output",
-            "call_id": tool_call.call_id,
-            "output": str(update_response),
-        }
+def run_get_citation_graph(args, session_id):
+    """Runs the get_citation_graph tool and returns its output"""
+    from citation_graph import (  # pylint: disable=import-outside-toplevel
+        get_citation_graph,
     )
 
-    print("🔁 Sending updated messages back to OpenAI.")
-    response = openai_client.responses.create(
-        model="gpt-4o-mini",
-        input=messages,
-        tools=TOOLS,
-        temperature=0.5,
-        store=True,
-    )
+    graph = get_citation_graph(args["work_ids"], args["depth"], args["direction"])
+    return graph if isinstance(graph, str) else encode_json(graph)
 
-    print("✅ Updated response appended to messages.")
-    messages.append({"role": "assistant", "content": response.output_text})
+
+def run_search_seen_works(args, session_id):
+    """Runs the search_seen_works tool and returns its output"""
+    works = search_stored_works(args["query"], args["author"])
+    return works if isinstance(works, str) else encode_json(works)
+
+
+TOOL_FUNCTIONS = {
+    "get_research_works": run_get_research_works,
+    "update_user_requirements": run_update_user_requirements,
+    "get_work_details": run_get_work_details,
+    "get_more_research_works": run_get_more_research_works,
+    "get_citation_graph": run_get_citation_graph,
+    "search_seen_works": run_search_seen_works,
+    # Add more tool functions here as needed
+}
+
+
+def run_tool_call(tool_call, session_id):
+    """Runs a single tool/function call and returns its output as a string"""
+    if tool_call.name not in TOOL_FUNCTIONS:
+        logger.error("❌ No handler found for the requested function.")
+        return (
+            "❌ Invalid request: The specified function name was not found. "
+            "Please verify the function name and try again."
+        )
+    args = json.loads(tool_call.arguments)
+    logger.info("⚙️ Calling function: %s with %s", tool_call.name, args)
+    with span(f"tool.{tool_call.name}", call_id=tool_call.call_id):
+        return str(TOOL_FUNCTIONS[tool_call.name](args, session_id))
+
+
+def handle_function_calls(tool_calls, messages, session_id):
+    """Handles tool/function calls received from OpenAI model.
+    Calls that update requirements run first, in order; the remaining
+    independent calls run concurrently. The function_call items and their
+    outputs are appended to messages in the order the model issued them."""
+    logger.info("📡 Detected %s function call(s) in model response.", len(tool_calls))
+    outputs = {}
+    for tool_call in tool_calls:
+        if tool_call.name in SERIAL_TOOLS:
+            outputs[tool_call.call_id] = run_tool_call(tool_call, session_id)
+
+    futures = {
+        tool_call.call_id: tool_executor.submit(
+            bind_context(run_tool_call), tool_call, session_id
+        )
+        for tool_call in tool_calls
+        if tool_call.call_id not in outputs
+    }
+    for call_id, future in futures.items():
+        outputs[call_id] = future.result()
+    logger.info("📄 Function calls completed. Appending messages.")
+
+    for tool_call in tool_calls:
+        messages.append(
+            {
+                "type": "function_call",
+                "call_id": tool_call.call_id,
+                "name": tool_call.name,
+                "arguments": tool_call.arguments,
+            }
+        )
+    for tool_call in tool_calls:
+        messages.append(
+            {
+                "type": "function_call_output",
+                "call_id": tool_call.call_id,
+                "output": outputs[tool_call.call_id],
+            }
+        )
     return messages
+
+
+def stream_response_events(messages, context=None, **kwargs):
+    """Streams one model response, yielding ('text', delta) and
+    ('function_call', item) events as they arrive."""
+    with span("llm.stream") as stream_span:
+        started = time.perf_counter()
+        first_event = True
+        for event in create_response(messages, context, stream=True, **kwargs):
+            if first_event:
+                stream_span.set(
+                    first_event_ms=round((time.perf_counter() - started) * 1000, 1)
+                )
+                first_event = False
+            if event.type == "response.completed":
+                set_usage_attributes(stream_span, event.response)
+                if context:
+                    context.record(event.response)
+            elif event.type == "response.output_text.delta":
+                yield "text", event.delta
+            elif (
+                event.type == "response.output_item.done"
+                and event.item.type == "function_call"
+            ):
+                yield "function_call", event.item
+
+
+def stream_chat_responses(messages, session_id, step_latencies=None, context=None):
+    """Stream Chat Responses from OpenAI.
+    Yields assistant text deltas for st.write_stream and runs the same tool
+    loop as get_chat_responses. When the generator is exhausted, messages
+    holds the same entries that get_chat_responses would have appended."""
+    logger.info("🟢 Starting streamed chat response process...")
+    tool_calls = []
+    kwargs = {}
+    for step in range(0, MAX_TOOL_STEPS + 1):
+        started = time.perf_counter()
+        if tool_calls:
+            handle_function_calls(tool_calls, messages, session_id)
+            logger.info("🔁 Streaming follow-up response from OpenAI.")
+        tools_done = time.perf_counter()
+
+        text_parts = []
+        step_calls, tool_calls = tool_calls, []
+        for kind, payload in stream_response_events(
+            messages, context, cache=True, **kwargs
+        ):
+            if kind == "text":
+                text_parts.append(payload)
+                yield payload
+            else:
+                tool_calls.append(payload)
+        record_step(step_latencies, step, started, tools_done, step_calls)
+
+        if not tool_calls:
+            break
+        if step + 1 == MAX_TOOL_STEPS:
+            kwargs = {"tool_choice": "none"}
+
+    logger.info("✅ Response appended to messages.")
+    messages.append({"role": "assistant", "content": "".join(text_parts)})
@@ -0,0 +1,274 @@
+"""Citation Graph Services"""
+
+import logging
+import os
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from openalex import (
+    WORK_DETAILS_BATCH_SIZE,
+    fetch_data,
+    parse_work_reference,
+)
+from openalex_client import strip_openalex_prefix
+from tracing import bind_context, span
+
+logger = logging.getLogger(__name__)
+
+# Breadth-first expansion limits
+CITATION_GRAPH_MAX_DEPTH = int(os.getenv("CITATION_GRAPH_MAX_DEPTH", "2"))
+CITATION_GRAPH_MAX_NODES = int(os.getenv("CITATION_GRAPH_MAX_NODES", "1000"))
+# Most-cited citing works fetched per batch of up to 50 frontier works
+CITING_WORKS_PER_BATCH = min(int(os.getenv("CITING_WORKS_PER_BATCH", "200")), 200)
+# Upper bound on OpenAlex requests in flight for one expansion
+CITATION_GRAPH_WORKERS = int(os.getenv("CITATION_GRAPH_WORKERS", "4"))
+PAGERANK_DAMPING = 0.85
+PAGERANK_ITERATIONS = 50
+
+GRAPH_SELECT_FIELDS = [
+    "id",
+    "doi",
+    "display_name",
+    "publication_year",
+    "cited_by_count",
+    "referenced_works",
+]
+DIRECTIONS = ("references", "citations", "both")
+
+graph_executor = ThreadPoolExecutor(max_workers=CITATION_GRAPH_WORKERS)
+
+
+class CitationGraph:
+    """A directed citation graph with an edge from each citing work to the
+    work it references. Nodes are numbered densely; their OpenAlex IDs,
+    BFS depth and metadata live in parallel lists, and edges in two int32
+    arrays, so the graph stays compact and converts to numpy directly."""
+
+    def __init__(self, max_nodes=CITATION_GRAPH_MAX_NODES):
+        self.max_nodes = max_nodes
+        self.ids = []
+        self.depths = array("b")
+        self.metadata = []
+        self.sources = array("i")
+        self.targets = array("i")
+        self._index = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def node(self, work_id):
+        """Returns the node number of a work, or None if it is not in the graph."""
+        return self._index.get(work_id)
+
+    def add_node(self, work_id, depth):
+        """Adds a work and returns its node number, or None once the graph
+        is full. Existing nodes keep their original depth."""
+        node = self._index.get(work_id)
+        if node is None and len(self.ids) < self.max_nodes:
+            node = self._index[work_id] = len(self.ids)
+            self.ids.append(work_id)
+            self.depths.append(depth)
+            self.metadata.append(None)
+        return node
+
+    def add_edge(self, citing, cited):
+        """Adds a citation edge between two node numbers."""
+        self.sources.append(citing)
+        self.targets.append(cited)
+
+    def edges(self):
+        """Returns the deduplicated (sources, targets) edge arrays."""
+        if not self.sources:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        keys = np.unique(
+            np.frombuffer(self.sources, np.int32).astype(np.int64) * len(self)
+            + np.frombuffer(self.targets, np.int32)
+        )
+        return keys // len(self), keys % len(self)
+
+    def in_degree(self):
+        """Returns how often each node is cited within the graph."""
+        _, targets = self.edges()
+        return np.bincount(targets, minlength=len(self))
+
+    def pagerank(self, damping=PAGERANK_DAMPING, iterations=PAGERANK_ITERATIONS):
+        """Returns the PageRank of every node over the citation edges.
+        Rank flows from citing to cited works; works that cite nothing in
+        the graph spread their rank evenly."""
+        n = len(self)
+        if n == 0:
+            return np.empty(0)
+        sources, targets = self.edges()
+        out_degree = np.bincount(sources, minlength=n).astype(float)
+        dangling = out_degree == 0
+        ranks = np.full(n, 1.0 / n)
+        for _ in range(iterations):
+            flow = np.bincount(
+                targets, weights=ranks[sources] / out_degree[sources], minlength=n
+            )
+            ranks = (1 - damping) / n + damping * (flow + ranks[dangling].sum() / n)
+        return ranks
+
+    def ranked_nodes(self, limit=20):
+        """Returns the non-seed works ranked by in-graph PageRank."""
+        ranks = self.pagerank()
+        cited = self.in_degree()
+        order = [n for n in np.argsort(-ranks, kind="stable") if self.depths[n] > 0]
+        return [
+            {
+                **(self.metadata[n] or {"id": self.ids[n]}),
+                "depth": int(self.depths[n]),
+                "cited_in_graph": int(cited[n]),
+                "pagerank": round(float(ranks[n]), 5),
+            }
+            for n in order[:limit]
+        ]
+
+
+def chunked_filter_urls(field, work_ids, per_page, sort=None):
+    """Builds OR-filter works URLs over work_ids, 50 IDs per URL."""
+    urls = []
+    for start in range(0, len(work_ids), WORK_DETAILS_BATCH_SIZE):
+        chunk = work_ids[start : start + WORK_DETAILS_BATCH_SIZE]
+        api_url = (
+            f"https://api.openalex.org/works"
+            f"?filter={field}:{'|'.join(chunk)}"
+            f"&select={','.join(GRAPH_SELECT_FIELDS)}"
+            f"&per_page={per_page}"
+        )
+        if sort:
+            api_url += f"&sort={sort}"
+        urls.append(api_url)
+    return urls
+
+
+def fetch_works_concurrently(urls):
+    """Fetches works URLs with bounded concurrency; failed URLs are skipped."""
+    futures = [
+        graph_executor.submit(bind_context(fetch_data), api_url) for api_url in urls
+    ]
+    works = []
+    for future in futures:
+        works.extend(future.result() or [])
+    return works
+
+
+def work_summary(result):
+    """Returns the metadata kept for a graph node."""
+    return {
+        "id": strip_openalex_prefix(result.get("id")),
+        "doi": result.get("doi"),
+        "name": result.get("display_name"),
+        "publication_year": result.get("publication_year"),
+        "cited_by_count": result.get("cited_by_count"),
+    }
+
+
+def add_references(graph, result, depth, grow):
+    """Records a fetched work and its reference edges. References outside
+    the graph become new nodes at depth only when grow is set."""
+    citing = graph.node(strip_openalex_prefix(result.get("id")))
+    if citing is None:
+        return []
+    graph.metadata[citing] = work_summary(result)
+    new_nodes = []
+    for reference in result.get("referenced_works") or []:
+        work_id = strip_openalex_prefix(reference)
+        cited = graph.node(work_id)
+        if cited is None and grow:
+            cited = graph.add_node(work_id, depth)
+            if cited is not None:
+                new_nodes.append(work_id)
+        if cited is not None:
+            graph.add_edge(citing, cited)
+    return new_nodes
+
+
+def add_citations(graph, result, depth):
+    """Adds a citing work as a node and links it to the graph works it cites."""
+    work_id = strip_openalex_prefix(result.get("id"))
+    is_new = graph.node(work_id) is None
+    citing = graph.add_node(work_id, depth)
+    if citing is None:
+        return []
+    add_references(graph, result, depth, grow=False)
+    return [work_id] if is_new else []
+
+
+def expand_citation_graph(work_ids, depth=1, direction="both", max_nodes=None):
+    """Builds the citation graph around seed works by breadth-first search.
+    Each level fetches the references of the frontier (ids.openalex) and
+    the most cited works citing it (cites:), 50 frontier works per request
+    and up to CITATION_GRAPH_WORKERS requests at a time. Nodes are
+    deduplicated by OpenAlex ID, and growth stops at max_nodes. Works
+    found at the last level are fetched once more so edges between them
+    are known, without adding new nodes."""
+    depth = max(1, min(int(depth), CITATION_GRAPH_MAX_DEPTH))
+    graph = CitationGraph(max_nodes or CITATION_GRAPH_MAX_NODES)
+    for work_id in work_ids:
+        lookup = parse_work_reference(work_id)
+        if lookup and lookup[0] == "ids.openalex":
+            graph.add_node(lookup[1], 0)
+
+    with span("citation_graph.expand", depth=depth, direction=direction) as graph_span:
+        frontier = list(graph.ids)
+        for level in range(1, depth + 1):
+            if not frontier:
+                break
+            urls = chunked_filter_urls(
+                "ids.openalex", frontier, WORK_DETAILS_BATCH_SIZE
+            )
+            if direction in ("citations", "both"):
+                urls += chunked_filter_urls(
+                    "cites", frontier, CITING_WORKS_PER_BATCH, "cited_by_count:desc"
+                )
+            grow_references = direction in ("references", "both")
+            frontier_set = set(frontier)
+            next_frontier = []
+            for result in fetch_works_concurrently(urls):
+                if strip_openalex_prefix(result.get("id")) in frontier_set:
+                    next_frontier += add_references(
+                        graph, result, level, grow_references
+                    )
+                else:
+                    next_frontier += add_citations(graph, result, level)
+            logger.info(
+                "🕸️ Citation graph level %s: %s works, %s new.",
+                level,
+                len(graph),
+                len(next_frontier),
+            )
+            frontier = list(dict.fromkeys(next_frontier))
+
+        # Citing works arrived with their references; fetch the rest
+        leaves = [
+            work_id
+            for work_id in frontier
+            if graph.metadata[graph.node(work_id)] is None
+        ]
+        for result in fetch_works_concurrently(
+            chunked_filter_urls("ids.openalex", leaves, WORK_DETAILS_BATCH_SIZE)
+        ):
+            add_references(graph, result, depth, grow=False)
+
+        graph_span.set(nodes=len(graph), edges=len(graph.sources))
+    return graph
+
+
+def get_citation_graph(work_ids, depth=1, direction="both", limit=20):
+    """Expands the citation graph around seed works and returns the most
+    central related works for the model."""
+    if direction not in DIRECTIONS:
+        return "❌ Invalid direction. Use 'references', 'citations' or 'both'."
+    graph = expand_citation_graph(work_ids, depth, direction)
+    seeds = [graph.ids[n] for n in range(len(graph)) if graph.depths[n] == 0]
+    if not seeds:
+        return "❌ No valid OpenAlex work IDs were given."
+    sources, _ = graph.edges()
+    return {
+        "seeds": seeds,
+        "works_in_graph": len(graph),
+        "citations_in_graph": len(sources),
+        "ranking": "PageRank over the citation edges between the works found",
+        "works": graph.ranked_nodes(limit),
+    }
@@ -111,4 +111,128 @@ UPDATE_USER_REQUIREMENTS_TOOL = {
     "strict": True,
 }
 
-TOOLS = [GET_RESEARCH_PAPERS_TOOL, UPDATE_USER_REQUIREMENTS_TOOL]
+GET_WORK_DETAILS_TOOL = {
+    "type": "function",
+    "name": "get_work_details",
+    "description": (
+        "Fetch the full records of one or more research works, including all "
+        "authors, their primary topic and open access details. Use this when "
+        "the user asks about specific papers from a truncated get_research_works "
+        "result. Pass every paper in one call; works that cannot be found are "
+        "returned with an error."
+    ),
+    "parameters": {
+        "type": "object",
+        "required": ["work_ids"],
+        "properties": {
+            "work_ids": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": (
+                    "OpenAlex work IDs or DOIs, for example "
+                    "['W4320920036', '10.1038/nature12373']"
+                ),
+            },
+        },
+        "additionalProperties": False,
+    },
+    "strict": True,
+}
+
+GET_CITATION_GRAPH_TOOL = {
+    "type": "function",
+    "name": "get_citation_graph",
+    "description": (
+        "Explore the citation network around one or more research works: the "
+        "works they reference, the works citing them, and so on up to the given "
+        "depth. Returns the related works ranked by how central they are in "
+        "that network. Use this when the user wants foundational papers, "
+        "follow-up work, or papers closely connected to ones they already know."
+    ),
+    "parameters": {
+        "type": "object",
+        "required": ["work_ids", "depth", "direction"],
+        "properties": {
+            "work_ids": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "OpenAlex work IDs to start from, e.g. ['W4320920036']",
+            },
+            "depth": {
+                "type": "integer",
+                "description": (
+                    "How many citation steps to follow from the given works. "
+                    "Use 1 unless the user asks for a wider network; at most 2."
+                ),
+            },
+            "direction": {
+                "type": "string",
+                "enum": ["references", "citations", "both"],
+                "description": (
+                    "'references' for earlier works they build on, 'citations' "
+                    "for later works citing them, or 'both'."
+                ),
+            },
+        },
+        "additionalProperties": False,
+    },
+    "strict": True,
+}
+
+SEARCH_SEEN_WORKS_TOOL = {
+    "type": "function",
+    "name": "search_seen_works",
+    "description": (
+        "Search the research works already retrieved earlier (by any search or "
+        "details lookup) by words in their title, authors or affiliations, and "
+        "in the abstracts of works whose details were looked up. Answers "
+        "locally in milliseconds, without a new OpenAlex search. Use this for "
+        "follow-up questions such as which of the papers mentioned a method, "
+        "or papers by an author seen earlier."
+    ),
+    "parameters": {
+        "type": "object",
+        "required": ["query", "author"],
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": (
+                    "Words that must appear in the work, e.g. 'metal hydrides'. "
+                    "Empty string to search by author only."
+                ),
+            },
+            "author": {
+                "type": "string",
+                "description": "Author name to match, or an empty string",
+            },
+        },
+        "additionalProperties": False,
+    },
+    "strict": True,
+}
+
+GET_MORE_RESEARCH_WORKS_TOOL = {
+    "type": "function",
+    "name": "get_more_research_works",
+    "description": (
+        "Fetch the next page of research papers for the most recent "
+        "get_research_works search. Use this when the user asks for more "
+        "results instead of searching again."
+    ),
+    "parameters": {
+        "type": "object",
+        "required": [],
+        "properties": {},
+        "additionalProperties": False,
+    },
+    "strict": True,
+}
+
+TOOLS = [
+    GET_RESEARCH_PAPERS_TOOL,
+    UPDATE_USER_REQUIREMENTS_TOOL,
+    GET_WORK_DETAILS_TOOL,
+    GET_MORE_RESEARCH_WORKS_TOOL,
+    GET_CITATION_GRAPH_TOOL,
+    SEARCH_SEEN_WORKS_TOOL,
+]
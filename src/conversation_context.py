@@ -0,0 +1,153 @@
+"""Conversation Context Services"""
+
+import json
+import os
+import re
+import threading
+
+# Approximate prompt budget for the conversation history sent each turn
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "12000"))
+# Chain turns with previous_response_id instead of resending the history
+CONTEXT_CHAINING = os.getenv("CONTEXT_CHAINING", "false").lower() == "true"
+
+OPENALEX_ID_PATTERN = re.compile(r"\b[WTAI]\d{4,}\b")
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """Returns the tiktoken encoding, loading it on first use, or False when
+    tiktoken is not installed."""
+    global _encoding  # pylint: disable=global-statement
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken  # pylint: disable=import-outside-toplevel
+
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except ImportError:  # tiktoken is optional
+                    _encoding = False
+    return _encoding
+
+
+def count_tokens(text):
+    """Counts (or estimates, without tiktoken) the tokens in a string."""
+    encoding = get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def item_text(item):
+    """Returns the text of a conversation item that counts towards the prompt."""
+    if item.get("type") == "function_call_output":
+        return item["output"]
+    if item.get("type") == "function_call":
+        return item["name"] + item["arguments"]
+    content = item.get("content", "")
+    return content if isinstance(content, str) else json.dumps(content)
+
+
+def compact_tool_output(output):
+    """Replaces a tool output with the OpenAlex IDs it mentioned."""
+    ids = list(dict.fromkeys(OPENALEX_ID_PATTERN.findall(output)))
+    return json.dumps(
+        {
+            "compacted": True,
+            "note": "Earlier tool output removed to save context. "
+            "Call the tools again with these IDs if the details are needed.",
+            "ids": ids,
+        },
+        separators=(",", ":"),
+    )
+
+
+class ConversationContext:
+    """Decides what part of a session's messages is sent to the model.
+    Tool outputs from earlier turns are compacted down to their IDs, and the
+    oldest turns are dropped once the history exceeds the token budget. With
+    chaining enabled, only items the model has not seen are sent, together
+    with previous_response_id. Token counts for every request are kept in
+    usage."""
+
+    def __init__(self, token_budget=CONTEXT_TOKEN_BUDGET, chaining=CONTEXT_CHAINING):
+        self.token_budget = token_budget
+        self.chaining = chaining
+        self.previous_response_id = None
+        self.synced = 0
+        self.usage = []
+        self._pending = None
+
+    def compact(self, messages):
+        """Returns a copy of messages that fits within the token budget."""
+        last_user = max(
+            (i for i, m in enumerate(messages) if m.get("role") == "user"), default=0
+        )
+        items = []
+        for i, message in enumerate(messages):
+            if i < last_user and message.get("type") == "function_call_output":
+                message = {**message, "output": compact_tool_output(message["output"])}
+            items.append(message)
+
+        tokens = [count_tokens(item_text(item)) for item in items]
+        total = sum(tokens)
+        dropped_calls = set()
+        keep = [True] * len(items)
+        for i, item in enumerate(items[:last_user]):
+            if total <= self.token_budget:
+                break
+            if item.get("role") == "system":
+                continue
+            keep[i] = False
+            total -= tokens[i]
+            if item.get("type") == "function_call":
+                dropped_calls.add(item["call_id"])
+
+        # Never send a tool output whose function_call was dropped
+        return [
+            item
+            for i, item in enumerate(items)
+            if keep[i] and item.get("call_id") not in dropped_calls
+        ]
+
+    def prepare(self, messages):
+        """Returns the input (and previous_response_id) for the next request."""
+        if self.chaining and self.previous_response_id:
+            new_items = [
+                m
+                for m in messages[self.synced :]
+                if m.get("type") != "function_call" and m.get("role") != "assistant"
+            ]
+            request = {
+                "input": new_items,
+                "previous_response_id": self.previous_response_id,
+            }
+        else:
+            request = {"input": self.compact(messages)}
+        self._pending = {
+            "messages": len(messages),
+            "items_sent": len(request["input"]),
+            "estimated_tokens": sum(
+                count_tokens(item_text(item)) for item in request["input"]
+            ),
+        }
+        return request
+
+    def record(self, response):
+        """Records the id and token usage of the response to the last request."""
+        self.previous_response_id = response.id
+        pending = self._pending or {"messages": self.synced}
+        self.synced = pending["messages"]
+        usage = getattr(response, "usage", None)
+        self.usage.append(
+            {
+                "items_sent": pending.get("items_sent"),
+                "estimated_tokens": pending.get("estimated_tokens"),
+                "input_tokens": getattr(usage, "input_tokens", None),
+                "output_tokens": getattr(usage, "output_tokens", None),
+            }
+        )
+        self._pending = None
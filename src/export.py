@@ -0,0 +1,241 @@
+"""Bulk Export Services"""
+
+import abc
+import csv
+import json
+import logging
+import os
+from constants import BASE_DIR
+from openalex import build_search_url, fetch_data, process_results
+from rate_limiter import BACKGROUND, with_priority
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = BASE_DIR / "src" / ".cache" / "exports"
+EXPORT_PER_PAGE = 200
+# Works written per batch; also the Parquet row group size
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+EXPORT_COLUMNS = [
+    "id",
+    "doi",
+    "name",
+    "relevance_score",
+    "publication_year",
+    "publication_date",
+    "authors",
+    "institutions",
+    "landing_page_url",
+    "pdf_url",
+]
+
+
+def flatten_work(work):
+    """Flattens a processed work into one row of EXPORT_COLUMNS."""
+    authorships = work.get("authorships", [])
+    institutions = dict.fromkeys(
+        institution
+        for authorship in authorships
+        for institution in authorship["institutions"]
+    )
+    row = {column: work.get(column) for column in EXPORT_COLUMNS}
+    row["authors"] = "; ".join(authorship["author"] for authorship in authorships)
+    row["institutions"] = "; ".join(institutions)
+    return row
+
+
+class FileExportWriter(abc.ABC):
+    """Base class for exports that append to a single file."""
+
+    newline = None
+
+    def __init__(self, path):
+        self.path = path
+        self.new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._fs = open(path, "a", newline=self.newline, encoding="utf-8")
+
+    def write(self, works):
+        """Writes a batch of works and flushes it to disk."""
+        self.write_rows(works)
+        self._fs.flush()
+        os.fsync(self._fs.fileno())
+
+    @abc.abstractmethod
+    def write_rows(self, works):
+        """Serialises a batch of works into the file."""
+
+    def offset(self):
+        """Returns the committed size of the export in bytes."""
+        return self._fs.tell()
+
+    def close(self):
+        """Closes the file."""
+        self._fs.close()
+
+
+class CsvExportWriter(FileExportWriter):
+    """Appends flattened works to a CSV file."""
+
+    newline = ""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._writer = csv.DictWriter(self._fs, fieldnames=EXPORT_COLUMNS)
+        if self.new_file:
+            self._writer.writeheader()
+
+    def write_rows(self, works):
+        self._writer.writerows(flatten_work(work) for work in works)
+
+
+class JsonlExportWriter(FileExportWriter):
+    """Appends complete processed works, one JSON object per line."""
+
+    def write_rows(self, works):
+        for work in works:
+            self._fs.write(json.dumps(work, ensure_ascii=False) + "\n")
+
+
+def import_pyarrow():
+    """Imports pyarrow on first use; it is only needed for Parquet exports."""
+    # pylint: disable=import-outside-toplevel
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow to be installed.") from e
+    return pyarrow, pyarrow.parquet
+
+
+class ParquetExportWriter:
+    """Writes each batch of works as a single-row-group Parquet part file
+    inside the export directory, so completed batches are never rewritten."""
+
+    def __init__(self, path):
+        self._pa, self._pq = import_pyarrow()
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._parts = len([p for p in os.listdir(path) if p.endswith(".parquet")])
+        pa = self._pa
+        types = {"relevance_score": pa.float64(), "publication_year": pa.int32()}
+        self._schema = pa.schema(
+            [(column, types.get(column, pa.string())) for column in EXPORT_COLUMNS]
+        )
+
+    def write(self, works):
+        """Writes a batch of works as the next part file."""
+        table = self._pa.Table.from_pylist(
+            [flatten_work(work) for work in works], schema=self._schema
+        )
+        part_path = os.path.join(self.path, f"part-{self._parts:05d}.parquet")
+        tmp_path = f"{part_path}.tmp"
+        self._pq.write_table(table, tmp_path, row_group_size=len(works))
+        os.replace(tmp_path, part_path)
+        self._parts += 1
+
+    def offset(self):
+        """Returns the number of committed part files."""
+        return self._parts
+
+    def close(self):
+        """Nothing to close; every part file is complete once written."""
+
+
+EXPORT_WRITERS = {
+    "csv": CsvExportWriter,
+    "jsonl": JsonlExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+def get_export_path(name, fmt):
+    """Returns the default output path of an export."""
+    suffix = "" if fmt == "parquet" else f".{fmt}"
+    return EXPORT_DIR / f"{name}{suffix}"
+
+
+def discard_uncommitted(path, fmt, offset):
+    """Removes output written after the last checkpoint of an interrupted run."""
+    if fmt == "parquet":
+        if not os.path.isdir(path):
+            return
+        for name in os.listdir(path):
+            if name.endswith(".tmp") or (
+                name.endswith(".parquet") and int(name[5:10]) >= offset
+            ):
+                os.remove(os.path.join(path, name))
+    elif os.path.exists(path):
+        with open(path, "r+b") as fs:
+            fs.truncate(offset)
+
+
+@with_priority(BACKGROUND)
+def export_works(user_requirements, path, fmt="csv", resume=True, progress=None):
+    """Streams every work matching the requirements to a CSV, JSONL or
+    Parquet export. Cursor pages of 200 works are normalised with
+    process_results and written in batches of EXPORT_BATCH_SIZE, so memory
+    stays bounded. After each batch the cursor is checkpointed next to the
+    output; a failed export resumes from there when run again.
+    progress(done, total) is called after every batch. Its OpenAlex
+    requests queue behind interactive ones at the rate limiter.
+    Returns the number of works in the export."""
+    if fmt not in EXPORT_WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    api_url = build_search_url(user_requirements, EXPORT_PER_PAGE)
+    path = str(path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    checkpoint_path = f"{path}.checkpoint.json"
+
+    checkpoint = None
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as fs:
+            checkpoint = json.load(fs)
+        if checkpoint["api_url"] != api_url or checkpoint["format"] != fmt:
+            checkpoint = None
+    if checkpoint is None:
+        checkpoint = {
+            "api_url": api_url,
+            "format": fmt,
+            "cursor": "*",
+            "done": 0,
+            "offset": 0,
+        }
+        discard_uncommitted(path, fmt, 0)
+    else:
+        logger.info("🔁 Resuming export after %s works.", checkpoint["done"])
+        discard_uncommitted(path, fmt, checkpoint["offset"])
+
+    writer = EXPORT_WRITERS[fmt](path)
+    batch = []
+    cursor = checkpoint["cursor"]
+    try:
+        while cursor:
+            data = fetch_data(f"{api_url}&cursor={cursor}", param=None, use_cache=False)
+            if data is None:
+                raise RuntimeError(
+                    "OpenAlex fetch failed. Run the export again to resume."
+                )
+            batch.extend(process_results(data["results"]))
+            cursor = data["meta"].get("next_cursor") if data["results"] else None
+
+            if len(batch) >= EXPORT_BATCH_SIZE or not cursor:
+                if batch:
+                    writer.write(batch)
+                checkpoint["done"] += len(batch)
+                checkpoint["cursor"] = cursor
+                checkpoint["offset"] = writer.offset()
+                tmp_path = f"{checkpoint_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as fs:
+                    json.dump(checkpoint, fs)
+                os.replace(tmp_path, checkpoint_path)
+                batch = []
+                if progress:
+                    progress(checkpoint["done"], data["meta"]["count"])
+    finally:
+        writer.close()
+
+    os.remove(checkpoint_path)
+    logger.info("✅ Exported %s works to %s", checkpoint["done"], path)
+    return checkpoint["done"]
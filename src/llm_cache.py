@@ -0,0 +1,147 @@
+"""Model Response Cache Services"""
+
+import hashlib
+import json
+import os
+import threading
+from types import SimpleNamespace
+from constants import BASE_DIR
+from response_cache import ResponseCache
+
+# 'on' lets call sites that opt in reuse responses to identical requests
+LLM_CACHE = os.getenv("LLM_CACHE", "on")
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+# Set to a file path (e.g. src/.cache/llm.sqlite) to persist across restarts
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+# Upper bound on responses kept in the SQLite file
+LLM_CACHE_MAX_ROWS = int(os.getenv("LLM_CACHE_MAX_ROWS", "5000"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+# Requests sampled above this temperature are never cached, since callers
+# using randomness expect a different answer every time. The default caches
+# deterministic requests only; OPENAI_TEMPERATURE defaults to 0.5.
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0"))
+
+
+def is_cacheable(temperature):
+    """Whether responses at this temperature may be cached."""
+    return LLM_CACHE != "off" and temperature <= LLM_CACHE_MAX_TEMPERATURE
+
+
+def normalize_items(items):
+    """Returns the input items with volatile details removed: call IDs,
+    which the model makes up anew every time, are renumbered in order of
+    appearance, and whitespace around message text is stripped."""
+    call_ids = {}
+    normalized = []
+    for item in items:
+        item = dict(item)
+        item.pop("id", None)
+        if "call_id" in item:
+            item["call_id"] = call_ids.setdefault(
+                item["call_id"], f"call_{len(call_ids)}"
+            )
+        if isinstance(item.get("content"), str):
+            item["content"] = item["content"].strip()
+        normalized.append(item)
+    return normalized
+
+
+def build_cache_key(model, tools, temperature, request):
+    """Hashes everything that determines a response: the model, tools,
+    temperature and the request's normalized input, plus any other
+    request options such as previous_response_id or tool_choice."""
+    payload = {
+        **request,
+        "input": normalize_items(request["input"]),
+        "model": model,
+        "tools": tools,
+        "temperature": temperature,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def dump_response(response):
+    """Returns the parts of a Responses API response the chat loop reads,
+    as a JSON-serialisable dictionary."""
+    output = []
+    for item in response.output:
+        if item.type == "function_call":
+            output.append(
+                {
+                    "type": item.type,
+                    "id": getattr(item, "id", None),
+                    "call_id": item.call_id,
+                    "name": item.name,
+                    "arguments": item.arguments,
+                }
+            )
+        elif item.type == "message":
+            output.append(
+                {
+                    "type": item.type,
+                    "content": [
+                        {"type": part.type, "text": getattr(part, "text", "")}
+                        for part in item.content
+                    ],
+                }
+            )
+    return {"id": response.id, "output": output, "output_text": response.output_text}
+
+
+def load_response(data):
+    """Rebuilds a response object with attribute access from dump_response().
+    Its usage is zero tokens, since serving it from the cache cost nothing."""
+    output = []
+    for item in data["output"]:
+        if item["type"] == "message":
+            content = [SimpleNamespace(**part) for part in item["content"]]
+            output.append(SimpleNamespace(type="message", content=content))
+        else:
+            output.append(SimpleNamespace(**item))
+    return SimpleNamespace(
+        id=data["id"],
+        output=output,
+        output_text=data["output_text"],
+        usage=SimpleNamespace(input_tokens=0, output_tokens=0),
+    )
+
+
+def replay_stream(response):
+    """Yields the stream events of a cached response: its text in one
+    delta, each function call, then response.completed."""
+    if response.output_text:
+        yield SimpleNamespace(
+            type="response.output_text.delta", delta=response.output_text
+        )
+    for item in response.output:
+        if item.type == "function_call":
+            yield SimpleNamespace(type="response.output_item.done", item=item)
+    yield SimpleNamespace(type="response.completed", response=response)
+
+
+def record_stream(events, cache_key):
+    """Passes stream events through, caching the response once it completes."""
+    for event in events:
+        if event.type == "response.completed":
+            get_llm_cache().set(cache_key, dump_response(event.response), LLM_CACHE_TTL)
+        yield event
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Returns the process-wide model response cache."""
+    global _llm_cache  # pylint: disable=global-statement
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                db_path = LLM_CACHE_PATH
+                if db_path and not os.path.isabs(db_path):
+                    db_path = str(BASE_DIR / db_path)
+                _llm_cache = ResponseCache(
+                    LLM_CACHE_SIZE, db_path, "llm_responses", LLM_CACHE_MAX_ROWS
+                )
+    return _llm_cache
@@ -1,16 +1,41 @@
 """Main Module"""
 
-import json
+import logging
+import os
+import uuid
 import streamlit as st
-from PIL import Image
-from chat import get_chat_responses, initialise_converstation
-from openalex import initialise_requirements_dictionary
+from chat import get_openai_client, initialise_converstation, stream_chat_responses
+from conversation_context import ConversationContext
+from export import EXPORT_FORMATS, export_works, get_export_path
+from requirements_store import get_requirements_store
 from constants import BASE_DIR
+from openalex_client import get_request_metrics, get_session
+from llm_cache import get_llm_cache
+from tracing import TRACE_DEBUG_PANEL, span
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
 
 image_path = BASE_DIR / "public" / "saira.png"
 
-# Load the image correctly
-saira_img = Image.open(image_path)
+
+@st.cache_data
+def load_image(path):
+    """Reads an image once per process; reruns reuse the cached bytes"""
+    with open(path, "rb") as fs:
+        return fs.read()
+
+
+@st.cache_resource
+def warm_up_clients():
+    """Creates the process-wide OpenAI and OpenAlex clients once"""
+    get_openai_client()
+    get_session()
+
+
+saira_img = load_image(image_path)
 
 
 # Streamlit UI
@@ -31,9 +56,9 @@ with cols[1]:
 # Initiate chat history
 if "messages" not in st.session_state:
     st.session_state.messages = initialise_converstation()
-    dict_path = BASE_DIR / "src" / "user_requirements.json"
-    with open(dict_path, "w", encoding="utf-8") as fs:
-        json.dump(initialise_requirements_dictionary(), fs)
+    st.session_state.session_id = uuid.uuid4().hex
+    st.session_state.context = ConversationContext()
+    get_requirements_store().reset(st.session_state.session_id)
 
 
 # Load history on reruns
@@ -50,13 +75,18 @@ if prompt := st.chat_input("What can I help you with?"):
     # Append user message to session state
     st.session_state.messages.append({"role": "user", "content": prompt})
 
-    # Get assistant's response and update messages
-    st.session_state.messages = get_chat_responses(st.session_state.messages)
-
-    # Display assistant message
-    with st.chat_message(name="assistant"):
-        assistant_message = st.session_state.messages[-1]["content"]
-        st.write(assistant_message)
+    # Stream assistant's response; messages are updated in place
+    st.session_state.step_latencies = []
+    with st.chat_message(name="assistant"), span("chat.turn") as turn:
+        st.write_stream(
+            stream_chat_responses(
+                st.session_state.messages,
+                st.session_state.session_id,
+                st.session_state.step_latencies,
+                st.session_state.context,
+            )
+        )
+    st.session_state.last_trace = list(turn.trace)
 
 # Sidebar Title
 st.sidebar.title("📚 SAIRA – Smart AI Research Assistant")
@@ -85,6 +115,84 @@ st.sidebar.markdown(
     """
 )
 
+# Bulk export of every work matching the current search
+st.sidebar.markdown("### 📥 Export Results")
+user_requirements = get_requirements_store().get(st.session_state.session_id)
+if user_requirements["filters"]["primary_topic_id"] == "":
+    st.sidebar.caption("Choose a topic in the chat to export all matching works.")
+else:
+    export_format = st.sidebar.selectbox("Export format", EXPORT_FORMATS)
+    if st.sidebar.button("Export all matching works"):
+        progress_bar = st.sidebar.progress(0.0, text="Starting export...")
+
+        def show_progress(done, total):
+            """Updates the sidebar progress bar during an export"""
+            fraction = min(done / total, 1.0) if total else 1.0
+            progress_bar.progress(fraction, text=f"{done:,} of {total:,} works")
+
+        export_path = get_export_path(st.session_state.session_id, export_format)
+        try:
+            count = export_works(
+                user_requirements, export_path, export_format, progress=show_progress
+            )
+            st.sidebar.success(f"Exported {count:,} works.")
+            if export_format == "parquet":
+                st.sidebar.caption(f"Saved to `{export_path}`")
+            else:
+                with open(export_path, "rb") as fs:
+                    st.sidebar.download_button(
+                        "Download export", fs, file_name=export_path.name
+                    )
+        except RuntimeError as e:
+            st.sidebar.error(str(e))
+
+
+def render_trace_waterfall(spans):
+    """Draws the spans of one turn as a waterfall chart in the sidebar"""
+    # Only needed with the debug panel on, so kept out of the start-up path
+    import altair as alt  # pylint: disable=import-outside-toplevel
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    by_id = {s.span_id: s for s in spans}
+    root_start = min(s.start_time for s in spans)
+
+    def depth(s):
+        return 0 if s.parent_id not in by_id else 1 + depth(by_id[s.parent_id])
+
+    rows = [
+        {
+            "order": i,
+            "span": f"{'· ' * depth(s)}{s.name}",
+            "start_ms": (s.start_time - root_start) * 1000,
+            "end_ms": (s.start_time - root_start + s.duration) * 1000,
+            "duration_ms": round(s.duration * 1000, 1),
+            "details": ", ".join(f"{k}={v}" for k, v in s.attributes.items()),
+        }
+        for i, s in enumerate(sorted(spans, key=lambda s: s.start_time))
+    ]
+    chart = (
+        alt.Chart(pd.DataFrame(rows))
+        .mark_bar()
+        .encode(
+            x=alt.X("start_ms", title="ms"),
+            x2="end_ms",
+            y=alt.Y("span", sort=alt.EncodingSortField("order"), title=None),
+            tooltip=["span", "duration_ms", "details"],
+        )
+    )
+    st.sidebar.altair_chart(chart)
+
+
+# Per-stage timings of the last turn, enabled with TRACE_DEBUG_PANEL=true
+if TRACE_DEBUG_PANEL and st.session_state.get("last_trace"):
+    st.sidebar.markdown("### 🐞 Last Turn Trace")
+    render_trace_waterfall(st.session_state.last_trace)
+if TRACE_DEBUG_PANEL:
+    with st.sidebar.expander("OpenAlex rate limiter"):
+        st.json(get_request_metrics())
+    with st.sidebar.expander("Model response cache"):
+        st.json(get_llm_cache().stats())
+
 st.sidebar.markdown("### 📘 Detailed Usage")
 st.sidebar.markdown(
     """
@@ -119,3 +227,6 @@ st.sidebar.markdown("✉️ svenkatlata@gmail.com")
 # Footer or App Version
 st.sidebar.markdown("---")
 st.sidebar.markdown("Version: `1.0.0`")
+
+# Done after the page is rendered, so the first paint does not wait on it
+warm_up_clients()
@@ -2,42 +2,81 @@
 
 import os
 import json
+import logging
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import partial
+from urllib.parse import quote
 import requests
-import pandas as pd
-from constants import BASE_DIR
-
-data_path = BASE_DIR / "src" / "topics_mapping.csv"
-topics_map = pd.read_csv(data_path)
+from openalex_client import request_json, request_span, strip_openalex_prefix
+from response_cache import get_response_cache, get_ttl, normalize_url
+from requirements_store import DEFAULT_SESSION_ID, get_requirements_store
+from topic_index import data_path, get_topic_index
+from tool_output import encode_json, encode_works
+from works_pager import WorksPager, get_session_pager, set_session_pager
+from tracing import bind_context, current_span, span, traced
+from rate_limiter import BACKGROUND, current_priority, with_priority
+from works_store import record_works
+from query_fanout import (
+    FANOUT_MIN_KEYWORDS,
+    FANOUT_PER_PAGE,
+    SEARCH_FANOUT,
+    build_keyword_variants,
+    reciprocal_rank_fusion,
+    work_keys,
+)
+from topic_prefetch import (
+    TOPIC_PREFETCH_COUNT,
+    get_session_prefetcher,
+    take_prefetched_search,
+)
+
+logger = logging.getLogger(__name__)
+
+# 'local', 'remote' or 'hybrid' topic recommendations
+TOPIC_RECOMMENDER_MODE = os.getenv("TOPIC_RECOMMENDER_MODE", "local")
+TOPIC_RECOMMENDATIONS = int(os.getenv("TOPIC_RECOMMENDATIONS", "10"))
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "8"))
+# Upper bound on OpenAlex IDs remembered as valid
+MAX_VALIDATED_ENTITIES = int(os.getenv("MAX_VALIDATED_ENTITIES", "10000"))
+# Works returned per search page, capped to keep tool outputs small
+RESULTS_PER_PAGE = min(int(os.getenv("RESULTS_PER_PAGE", "10")), 50)
+# Marks pager cursors that continue a fan-out search past its fused list
+FALLBACK_CURSOR_PREFIX = "next:"
+
+search_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS)
+# Kept apart from search_executor, whose searches wait on the fan-out requests
+fanout_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS)
+_validated_entities = OrderedDict()
+_validated_entities_lock = threading.Lock()
 
 
 def get_topic_id(topic_name):
     """Fetches the topic ID for a given topic name."""
-    topics = (
-        topics_map[["topic_id", "topic_name"]]
-        .set_index("topic_name")
-        .to_dict()["topic_id"]
-    )
-    return topics[topic_name] if topic_name in topics else False
-
-
-def fetch_data(api_url, param="results"):
-    """Fetches data from a specified endpoint."""
-    try:
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()  # Raise an error for bad responses
-        return response.json()[param] if param else response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching data: {e}")
-        return None
-
-
-def get_page_count(api_url):
-    """Gets Page Count"""
-    metadata = fetch_data(api_url, "meta")
-    pages = pages = (metadata["count"] // metadata["per_page"]) + 1
-    return pages
+    return get_topic_index().get_id(topic_name) or False
+
+
+def fetch_data(api_url, param="results", use_cache=True):
+    """Fetches data from a specified endpoint through the pooled OpenAlex client.
+    Responses are served from the response cache when a fresh copy exists."""
+    with request_span("openalex.fetch", api_url) as fetch_span:
+        cache = get_response_cache()
+        cache_key = normalize_url(api_url)
+        data = cache.get(cache_key) if use_cache else None
+        fetch_span.set(cache_hit=data is not None)
+        if data is not None:
+            return data[param] if param else data
+        try:
+            data = request_json(api_url)
+            cache.set(cache_key, data, get_ttl(api_url))
+            return data[param] if param else data
+        except requests.exceptions.RequestException as e:
+            logger.error("Error fetching data: %s", e)
+            fetch_span.set(error=str(e))
+            return None
 
 
 # def get_research_papers(keywords, sort_by, has_open_access):
@@ -87,59 +126,311 @@ def get_page_count(api_url):
 #     return works_json
 
 
-def get_research_papers(keywords, sort_by, has_open_access):
+def get_research_papers(
+    keywords, sort_by, has_open_access, session_id=DEFAULT_SESSION_ID
+):
     """Fetch research papers based on user-defined keywords and filters.
     This function constructs an API query to fetch research papers from OpenAlex
     based on the provided keywords. If no specific topic has been selected in
     USER_REQUIREMENTS dictionary, it recommends a list of relevant topics for user selection.
     Otherwise, it fetches papers sorted and filtered based on user preferences."""
-    print("🔍 Fetching research papers...")
+    logger.info("🔍 Fetching research papers...")
+
+    save_user_requirements(
+        session_id,
+        {
+            "keywords": list(
+                {keyword.strip(" ,\t\n\r") for keyword in keywords.lower().split()}
+            ),
+            "sort_by": sort_by,
+            "has_open_access": has_open_access,
+        },
+    )
+    user_requirements = get_requirements_store().get(session_id)
+    return search_works(user_requirements, session_id)
 
-    dict_path = BASE_DIR / "src" / "user_requirements.json"
 
-    with open(dict_path, "r+", encoding="utf-8") as fs:
-        user_requirements = json.load(fs)
-        user_requirements["keywords"] = list(
-            {keyword.strip(" ,\t\n\r") for keyword in keywords.lower().split()}
-        )
-        user_requirements["sort_by"] = sort_by
-        user_requirements["has_open_access"] = has_open_access
-        fs.seek(0)
-        json.dump(user_requirements, fs, indent=4, ensure_ascii=False)
-        fs.truncate()
+def search_works(user_requirements, session_id=DEFAULT_SESSION_ID):
+    """Runs the search for a requirements dictionary and makes its result
+    pager the session's active one."""
+    output, pager = run_works_search(user_requirements, session_id)
+    if pager is not None:
+        show_search(session_id, pager)
+    return output
 
-    keywords_query = "%20".join(user_requirements["keywords"])
+
+def show_search(session_id, pager):
+    """Makes a search's pager the session's active one and adds the page
+    it served to the works store, as that page is returned to the model."""
+    set_session_pager(session_id, pager)
+    record_works(pager.last_page)
+
+
+def run_works_search(user_requirements, session_id=None):
+    """Runs the search for a requirements dictionary without touching the
+    stored requirements or the active pager. Returns the tool output and
+    the result pager (None when topics were recommended instead).
+    With a session_id, topic searches are prefetched when topics are
+    recommended, and a prefetched first page is used when one exists."""
     if user_requirements["filters"]["primary_topic_id"] == "":
-        return recommend_relevant_topics(keywords_query, has_open_access)
+        keywords_query = "%20".join(user_requirements["keywords"])
+        groups = get_topic_groups(
+            keywords_query,
+            user_requirements["has_open_access"],
+            filters=user_requirements["filters"],
+        )
+        prefetch_topic_searches(user_requirements, groups, session_id)
+        return format_topic_recommendations(groups), None
+
+    api_url, fetch_page = build_page_fetcher(user_requirements)
+    logger.info("🌐 API URL constructed: %s", api_url)
+
+    pager = WorksPager(fetch_page)
+    prefetched = take_prefetched_search(session_id, api_url)
+    page = prefetched.result() if prefetched else None
+    if page is not None:
+        logger.info("⚡ Using prefetched results for the selected topic.")
+        works = pager.serve_fetched(page)
+    else:
+        works = pager.next_page()
+    if works is None:
+        return "❌ API fetch failed.", None
+    logger.info("📦 Data fetched from OpenAlex API.")
+
+    logger.info("✅ All results processed. Converting to JSON.")
+    return encode_works(works), pager
+
+
+def get_more_research_papers(session_id=DEFAULT_SESSION_ID):
+    """Returns the next page of results for the session's last search.
+    The page is usually already prefetched, so no new query is made."""
+    pager = get_session_pager(session_id)
+    if pager is None:
+        return "❌ No active search. Call get_research_works first."
+    works = pager.next_page()
+    if works is None:
+        return "❌ API fetch failed."
+    if not works:
+        return "No more results for this search."
+    record_works(works)
+    logger.info("📦 Served page %s of the current search.", pager.pages_served)
+    return encode_works(works)
+
+
+def prefetch_topic_searches(user_requirements, groups, session_id):
+    """Starts fetching the first page of works for the top recommended
+    topics, so that choosing one of them needs no OpenAlex request. The
+    fetches are speculative, so they queue behind interactive requests at
+    background priority. The recommended topic IDs come from OpenAlex or
+    the topic index, so they are also marked as validated."""
+    if session_id is None:
+        return
+    searches = {}
+    for group in groups:
+        remember_validated_entity(group["id"])
+        if len(searches) < TOPIC_PREFETCH_COUNT:
+            requirements = {
+                **user_requirements,
+                "filters": {
+                    **user_requirements["filters"],
+                    "primary_topic_id": group["id"],
+                },
+            }
+            api_url, fetch_page = build_page_fetcher(requirements)
+            fetch = with_priority(BACKGROUND)(partial(fetch_page, "*"))
+            request_count = (
+                len(build_fanout_urls(requirements)) if use_fanout(requirements) else 1
+            )
+            searches[api_url] = (fetch, request_count)
+    started = get_session_prefetcher(session_id).prefetch(searches)
+    logger.info("⚡ Prefetching works for %s recommended topics.", started)
 
-    primary_topic_id = user_requirements["filters"]["primary_topic_id"]
 
-    api_url = construct_sort_by_api_url(
-        keywords_query, primary_topic_id, sort_by, has_open_access
-    )
-    print(f"🌐 API URL constructed: {api_url}")
+def fetch_works_page(api_url, cursor):
+    """Fetches one cursor page of works, returning (works, next_cursor)."""
+    data = fetch_data(f"{api_url}&cursor={cursor}", param=None)
+    if data is None:
+        return None
+    return process_results(data["results"]), data["meta"].get("next_cursor")
+
 
-    results = fetch_data(api_url)
-    print("📦 Data fetched from OpenAlex API.")
+def build_page_fetcher(user_requirements):
+    """Returns the URL identifying a works search and the fetch_page(cursor)
+    function its pager walks. Fan-out searches page through the fused list."""
+    api_url = build_search_url(user_requirements, RESULTS_PER_PAGE)
+    if use_fanout(user_requirements):
+        return api_url, partial(fetch_fused_page, build_fanout_urls(user_requirements))
+    return api_url, partial(fetch_works_page, api_url)
 
-    works = process_results(results)
 
-    print("✅ All results processed. Converting to JSON.")
-    return json.dumps(works, indent=4)
+def use_fanout(user_requirements):
+    """Whether a search is split into keyword variants fused by rank. Only
+    relevance-ranked searches are fused; sorted ones keep a single query."""
+    return (
+        SEARCH_FANOUT != "off"
+        and user_requirements["sort_by"] not in SORT_OPTIONS
+        and len(user_requirements["keywords"]) >= FANOUT_MIN_KEYWORDS
+    )
 
 
-def recommend_relevant_topics(keywords_query, has_open_access):
-    """Suggests relevant topics when the topic_id is not set in USER_REQUIREMENTS."""
+def build_fanout_urls(user_requirements):
+    """Builds one search URL per keyword variant, with the same filters."""
+    return [
+        build_search_url({**user_requirements, "keywords": keywords}, FANOUT_PER_PAGE)
+        for keywords in build_keyword_variants(user_requirements["keywords"])
+    ]
+
+
+def fetch_fused_page(api_urls, cursor):
+    """Fetches every keyword variant concurrently, so the fan-out takes
+    about one OpenAlex round trip, and returns a page of the fused ranking.
+    Variant responses are cached, so later pages need no new requests.
+    The variants are queued at the caller's rate-limiter priority."""
+    fetch = with_priority(current_priority())(bind_context(fetch_data))
+    with span("openalex.fanout", variants=len(api_urls)):
+        futures = [
+            fanout_executor.submit(fetch, f"{api_url}&cursor=*", None)
+            for api_url in api_urls
+        ]
+        responses = [future.result() for future in futures]
+    if cursor.startswith(FALLBACK_CURSOR_PREFIX):
+        return fetch_fallback_page(api_urls[0], responses, cursor)
+    return fuse_results_page(responses, cursor)
+
+
+def fuse_results_page(responses, cursor):
+    """Fuses the variants' raw results by reciprocal rank and returns the
+    (works, next_cursor) page at cursor, an offset into the fused list.
+    Once the fused list is used up, the next cursor continues the
+    all-keywords search. Returns None when every variant failed."""
+    if all(data is None for data in responses):
+        return None
+    fused, _ = reciprocal_rank_fusion(
+        [data["results"] if data else [] for data in responses]
+    )
+    current_span().set(fused_works=len(fused))
+    start = 0 if cursor == "*" else int(cursor)
+    end = start + RESULTS_PER_PAGE
+    if end < len(fused):
+        next_cursor = str(end)
+    else:
+        next_cursor = build_fallback_cursor(responses[0] and responses[0]["meta"])
+    return process_results(fused[start:end]), next_cursor
+
+
+def build_fallback_cursor(meta):
+    """Returns the pager cursor that continues the all-keywords search at
+    the next OpenAlex cursor page, or None when there are no more pages."""
+    next_cursor = meta.get("next_cursor") if meta else None
+    return f"{FALLBACK_CURSOR_PREFIX}{next_cursor}:0" if next_cursor else None
+
+
+def fetch_fallback_page(api_url, responses, cursor):
+    """Returns the next page of the all-keywords search, at an OpenAlex
+    cursor page and an offset into it, without the works already shown
+    from the fused list. OpenAlex pages of FANOUT_PER_PAGE are cut into
+    pages of RESULTS_PER_PAGE; they come from the response cache after
+    the first read."""
+    shown = {
+        key
+        for data in responses
+        if data
+        for result in data["results"]
+        for key in work_keys(result)
+    }
+    page_cursor, _, offset = cursor.removeprefix(FALLBACK_CURSOR_PREFIX).rpartition(":")
+    offset, results = int(offset), []
+    while len(results) < RESULTS_PER_PAGE:
+        data = fetch_data(f"{api_url}&cursor={page_cursor}", param=None)
+        if data is None:
+            return None
+        unseen = [
+            result for result in data["results"] if shown.isdisjoint(work_keys(result))
+        ]
+        taken = unseen[offset : offset + RESULTS_PER_PAGE - len(results)]
+        results += taken
+        offset += len(taken)
+        if offset < len(unseen):
+            next_cursor = f"{FALLBACK_CURSOR_PREFIX}{page_cursor}:{offset}"
+            break
+        next_cursor = build_fallback_cursor(data["results"] and data["meta"])
+        if next_cursor is None:
+            break
+        page_cursor, offset = data["meta"]["next_cursor"], 0
+    return process_results(results), next_cursor
+
+
+def get_remote_topic_groups(keywords_query, has_open_access, filters=None):
+    """Groups matching works by primary topic on OpenAlex."""
     group_by = "primary_topic.id"
-    api_url = construct_group_by_api_url(keywords_query, group_by, has_open_access)
-    print(f"🌐 API URL constructed: {api_url}")
+    api_url = construct_group_by_api_url(
+        keywords_query, group_by, has_open_access, filters
+    )
+    logger.info("🌐 API URL constructed: %s", api_url)
 
     results = fetch_data(api_url, param="group_by")
-    print("📦 Data fetched from OpenAlex API.")
+    logger.info("📦 Data fetched from OpenAlex API.")
 
-    groups = process_groups(results)
+    return process_groups(results or [])
 
-    print("✅ All results processed. Converting to JSON.")
+
+def get_local_topic_groups(keywords_query):
+    """Ranks topics locally from topics_mapping.csv, or None if unavailable.
+    The recommender (numpy and scipy) is imported on first use."""
+    from topic_recommender import (  # pylint: disable=import-outside-toplevel
+        recommend_topics,
+    )
+
+    try:
+        return recommend_topics(keywords_query, TOPIC_RECOMMENDATIONS)
+    except FileNotFoundError:
+        logger.error("❌ topics_mapping.csv not found. Falling back to OpenAlex.")
+        return None
+
+
+def recommend_relevant_topics(keywords_query, has_open_access, mode=None, filters=None):
+    """Suggests relevant topics when the topic_id is not set in USER_REQUIREMENTS."""
+    groups = get_topic_groups(keywords_query, has_open_access, mode, filters)
+    return format_topic_recommendations(groups)
+
+
+@traced("topics.recommend")
+def get_topic_groups(keywords_query, has_open_access, mode=None, filters=None):
+    """Returns the recommended topics as a list of {id, name} groups.
+    mode is 'local' (offline ranking over topics_mapping.csv), 'remote'
+    (OpenAlex group_by) or 'hybrid' (both, merged by rank fusion)."""
+    mode = mode or TOPIC_RECOMMENDER_MODE
+    groups = get_local_topic_groups(keywords_query) if mode != "remote" else None
+
+    if not groups:
+        groups = get_remote_topic_groups(keywords_query, has_open_access, filters)
+    elif mode == "hybrid":
+        remote_groups = get_remote_topic_groups(
+            keywords_query, has_open_access, filters
+        )
+        groups = merge_topic_groups(groups, remote_groups)
+
+    logger.info("✅ All results processed. Converting to JSON.")
+    return groups
+
+
+def merge_topic_groups(local_groups, remote_groups):
+    """Merges local and OpenAlex topic suggestions by reciprocal rank fusion."""
+    from topic_recommender import (  # pylint: disable=import-outside-toplevel
+        merge_topic_rankings,
+    )
+
+    names = {group["id"]: group["name"] for group in remote_groups + local_groups}
+    merged_ids = merge_topic_rankings(
+        [group["id"] for group in local_groups],
+        [group["id"] for group in remote_groups],
+        TOPIC_RECOMMENDATIONS,
+    )
+    return [{"id": topic_id, "name": names[topic_id]} for topic_id in merged_ids]
+
+
+def format_topic_recommendations(groups):
+    """Wraps suggested topics with instructions for the model."""
     response = {
         "instructions": (
             "The provided keywords are too broad to return specific results. "
@@ -154,7 +445,7 @@ def recommend_relevant_topics(keywords_query, has_open_access):
         "data": groups,
     }
 
-    return json.dumps(response, indent=4)
+    return encode_json(response)
 
 
 # def format_keywords(keywords):
@@ -167,48 +458,100 @@ def recommend_relevant_topics(keywords_query, has_open_access):
 #     return formatted_keywords
 
 
+WORKS_SELECT_FIELDS = [
+    "id",
+    "doi",
+    "display_name",
+    "authorships",
+    "relevance_score",
+    "publication_year",
+    "publication_date",
+    "best_oa_location",
+]
+
+SORT_OPTIONS = {
+    "publication_year": "publication_year:desc",
+    "cited_by_count": "cited_by_count:desc",
+    "works_count": "works_count:desc",
+}
+
+# Stored filter keys and the OpenAlex works filters they map to
+FILTER_FIELDS = {
+    "primary_topic_id": "primary_topic.id",
+    "author_id": "authorships.author.id",
+    "institution_id": "authorships.institutions.id",
+    "work_id": "ids.openalex",
+    "doi": "doi",
+}
+
+
+def build_search_url(user_requirements, per_page=10, select=None):
+    """Builds the works search URL for a user requirements dictionary"""
+    return construct_sort_by_api_url(
+        "%20".join(user_requirements["keywords"]),
+        user_requirements["filters"],
+        user_requirements["sort_by"],
+        user_requirements["has_open_access"],
+        per_page,
+        select,
+    )
+
+
+def build_works_filter(filters, has_open_access):
+    """Composes every stored filter into one OpenAlex filter= expression"""
+    filters = filters or {}
+    parts = [
+        f"{field}:{filters[key]}"
+        for key, field in FILTER_FIELDS.items()
+        if filters.get(key)
+    ]
+    if filters.get("from_publication_year"):
+        parts.append(f"from_publication_date:{filters['from_publication_year']}-01-01")
+    if filters.get("to_publication_year"):
+        parts.append(f"to_publication_date:{filters['to_publication_year']}-12-31")
+    if has_open_access:
+        parts.append("is_oa:true")
+    parts.append("has_abstract:true")
+    return ",".join(parts)
+
+
 def construct_sort_by_api_url(
-    keywords_query, primary_topic_id, sort_by, has_open_access
+    keywords_query, filters, sort_by, has_open_access, per_page=10, select=None
 ):
     """Constructs the OpenAlex API URL with filters and sort options"""
     api_url = (
         f"https://api.openalex.org/works"
         f"?search={keywords_query}"
-        f"&filter=primary_topic.id:{primary_topic_id},is_oa:{has_open_access},has_abstract:true"
-        f"&select=id,doi,display_name,authorships,relevance_score,"
-        f"publication_year,publication_date,best_oa_location"
-        f"&per_page=10"
+        f"&filter={build_works_filter(filters, has_open_access)}"
+        f"&select={','.join(select or WORKS_SELECT_FIELDS)}"
+        f"&per_page={per_page}"
     )
 
-    if sort_by == "publication_year":
-        api_url += "&sort=publication_year:desc"
-    elif sort_by == "cited_by_count":
-        api_url += "&sort=cited_by_count:desc"
-    elif sort_by == "works_count":
-        api_url += "&sort=works_count:desc"
+    if sort_by in SORT_OPTIONS:
+        api_url += f"&sort={SORT_OPTIONS[sort_by]}"
 
     return api_url
 
 
-def construct_group_by_api_url(keywords_query, group_by, has_open_access):
+def construct_group_by_api_url(keywords_query, group_by, has_open_access, filters=None):
     """Constructs the OpenAlex API URL with filters and grouping options"""
     api_url = (
         f"https://api.openalex.org/works"
         f"?search={keywords_query}"
-        f"&filter=is_oa:{has_open_access},has_abstract:true"
+        f"&filter={build_works_filter(filters, has_open_access)}"
         f"&per_page=10"
         f"&group_by={group_by}"
     )
     return api_url
 
 
+@traced("openalex.process_results")
 def process_results(results):
     """Processes API results and extracts relevant paper metadata"""
     works = []
-    for idx, res in enumerate(results):
-        print(f"📝 Processing result {idx + 1}/{len(results)}")
+    for res in results:
         work = {
-            "id": re.sub(r"https://openalex\.org/", "", res["id"]),
+            "id": strip_openalex_prefix(res["id"]),
             "doi": res["doi"],
             "name": res["display_name"],
             "relevance_score": res["relevance_score"],
@@ -226,13 +569,13 @@ def process_results(results):
     return works
 
 
+@traced("openalex.process_groups")
 def process_groups(results):
     """Processes API results and extracts relevant grouping metadata"""
     groups = []
-    for idx, res in enumerate(results):
-        print(f"📝 Processing result {idx + 1}/{len(results)}")
+    for res in results:
         group = {
-            "id": re.sub(r"https://openalex\.org/", "", res["key"]),
+            "id": strip_openalex_prefix(res["key"]),
             "name": res["key_display_name"],
         }
         groups.append(group)
@@ -253,142 +596,301 @@ def extract_authorships(authorships_data):
     return authorships
 
 
-def save_user_requirements(user_requirements, file_stream):
-    """Save the updated user requirements to the JSON file."""
-    file_stream.seek(0)
-    json.dump(user_requirements, file_stream, indent=4, ensure_ascii=False)
-    file_stream.truncate()
+def save_user_requirements(session_id, changes):
+    """Save the updated user requirements fields to the session's store."""
+    get_requirements_store().update(session_id, changes)
 
 
-def update_id_filter(key, value, user_requirements, file_stream):
-    """Update OpenAlex ID-based filters such as topic, author, or institution."""
-    prefix_map = {
-        "T": ("topics", "primary_topic_id"),
-        "W": ("works", "work_id"),
-        "A": ("authors", "author_id"),
-        "I": ("institutions", "institution_id"),
-    }
+# OpenAlex ID prefixes and the endpoint used to validate them
+ID_FILTER_ENDPOINTS = {
+    "T": ("topics", "primary_topic_id"),
+    "W": ("works", "work_id"),
+    "A": ("authors", "author_id"),
+    "I": ("institutions", "institution_id"),
+}
 
-    prefix = value[0].upper()
-    if prefix not in prefix_map:
+
+def parse_doi_filter(value):
+    """Returns the DOI filter value to save for a DOI, with or without its
+    https://doi.org/ prefix, and the OpenAlex URL that validates it."""
+    if not value.startswith("https://doi.org/"):
+        value = f"https://doi.org/{value}"
+    api_url = f"https://api.openalex.org/works/{value}"
+    return value, api_url
+
+
+def parse_year_filter(value):
+    """Returns (year, None) for a valid publication year, else (None, error)."""
+    try:
+        year = int(value)
+    except (TypeError, ValueError):
+        return None, "❌ Invalid year format."
+    if not 1800 <= year <= datetime.now().year:
+        return None, "❌ Year is out of valid range."
+    return year, None
+
+
+def parse_id_filter(value):
+    """Returns the OpenAlex URL that validates an ID filter value and the
+    filter's label, or None if the ID prefix is not a known entity."""
+    prefix = value[0].upper() if value else ""
+    if prefix not in ID_FILTER_ENDPOINTS:
         return None
+    endpoint, label = ID_FILTER_ENDPOINTS[prefix]
+    return f"https://api.openalex.org/{endpoint}/{value}", label
 
-    endpoint, label = prefix_map[prefix]
-    api_url = f"https://api.openalex.org/{endpoint}/{value}"
-    results = fetch_data(api_url, param="")
 
-    if (
-        results
-        and re.sub(r"https://openalex\.org/", "", results.get("id", "")) == value
-    ):
-        user_requirements["filters"][key] = value
-        save_user_requirements(user_requirements, file_stream)
-        print(f"✅ {label} updated successfully.")
-        return get_research_papers(
-            " ".join(user_requirements["keywords"]),
-            user_requirements["sort_by"],
-            user_requirements["has_open_access"],
+def update_id_filter(key, value, user_requirements, session_id):
+    """Update OpenAlex ID-based filters such as topic, author, or institution."""
+    parsed = parse_id_filter(value)
+    if parsed is None:
+        return None
+
+    api_url, label = parsed
+    user_requirements["filters"][key] = value
+
+    if is_validated_entity(value):
+        search = None
+    else:
+        # Validate the ID and run the filtered search at the same time. The
+        # speculative search runs without the session, so it neither starts
+        # nor uses topic prefetches, and is discarded if the ID is invalid.
+        search = search_executor.submit(
+            bind_context(run_works_search), user_requirements, None
         )
-    return "❌ Invalid ID or API fetch failed."
+        if not validate_entity(api_url, value):
+            search.add_done_callback(close_search_pager)
+            return "❌ Invalid ID or API fetch failed."
+        remember_validated_entity(value)
+
+    save_user_requirements(session_id, {f"filters.{key}": value})
+    logger.info("✅ %s updated successfully.", label)
+    if search is None:
+        output, pager = run_works_search(user_requirements, session_id)
+    else:
+        output, pager = search.result()
+    if pager is not None:
+        show_search(session_id, pager)
+    return output
+
+
+def validate_entity(api_url, entity_id):
+    """Checks that an OpenAlex entity exists and has the given ID."""
+    results = fetch_data(api_url, param="")
+    return bool(results and strip_openalex_prefix(results.get("id")) == entity_id)
+
+
+def close_search_pager(search):
+    """Closes the pager of a discarded search once it has finished."""
+    if not search.cancelled() and search.exception() is None:
+        _, pager = search.result()
+        if pager is not None:
+            pager.close()
+
 
+def is_validated_entity(entity_id):
+    """Whether an OpenAlex ID has already been validated in this process."""
+    with _validated_entities_lock:
+        if entity_id in _validated_entities:
+            _validated_entities.move_to_end(entity_id)
+            return True
+        return False
 
-def update_doi(value, user_requirements, file_stream):
+
+def remember_validated_entity(entity_id):
+    """Adds an OpenAlex ID to the validated entity cache."""
+    with _validated_entities_lock:
+        _validated_entities[entity_id] = True
+        while len(_validated_entities) > MAX_VALIDATED_ENTITIES:
+            _validated_entities.popitem(last=False)
+
+
+def update_doi(value, session_id):
     """Update DOI value after validating it through the API."""
-    if not value.startswith("https://doi.org/"):
-        value = f"https://doi.org/{value}"
-    api_url = f"https://api.openalex.org/works/{value}"
+    doi, api_url = parse_doi_filter(value)
     results = fetch_data(api_url, param="")
 
     if results:
-        user_requirements["filters"]["doi"] = re.sub(
-            r"https://openalex\.org/", "", value
-        )
-        save_user_requirements(user_requirements, file_stream)
-        print("✅ DOI updated successfully.")
+        save_user_requirements(session_id, {"filters.doi": doi})
+        logger.info("✅ DOI updated successfully.")
         return results
     return "❌ DOI not found or invalid."
 
 
-def update_year_filter(key, value, user_requirements, file_stream):
+def update_year_filter(key, value, user_requirements, session_id):
     """Validate and update year filters."""
-    try:
-        year = int(value)
-        if 1800 <= year <= datetime.now().year:
-            user_requirements["filters"][key] = year
-            save_user_requirements(user_requirements, file_stream)
-            print(f"✅ {key} updated to {year}.")
-            return get_research_papers(
-                " ".join(user_requirements["keywords"]),
-                user_requirements["sort_by"],
-                user_requirements["has_open_access"],
-            )
-        else:
-            return "❌ Year is out of valid range."
-    except ValueError:
-        return "❌ Invalid year format."
+    year, error = parse_year_filter(value)
+    if error:
+        return error
+    save_user_requirements(session_id, {f"filters.{key}": year})
+    logger.info("✅ %s updated to %s.", key, year)
+    user_requirements["filters"][key] = year
+    return search_works(user_requirements, session_id)
 
 
-def update_user_requirements(key, value):
+def update_user_requirements(key, value, session_id=DEFAULT_SESSION_ID):
     """
     Main function to update user requirements dictionary based on a filter key and value.
     """
-    dict_path = BASE_DIR / "src" / "user_requirements.json"
-    with open(dict_path, "r+", encoding="utf-8") as fs:
-        user_requirements = json.load(fs)
+    user_requirements = get_requirements_store().get(session_id)
 
-        if key not in user_requirements["filters"] and key != "doi":
-            return "❌ Invalid key."
+    if key not in user_requirements["filters"] and key != "doi":
+        return "❌ Invalid key."
 
-        if key == "doi":
-            return update_doi(value, user_requirements, fs)
+    if key == "doi":
+        return update_doi(value, session_id)
 
-        if key in ["from_publication_year", "to_publication_year"]:
-            return update_year_filter(key, value, user_requirements, fs)
+    if key in ["from_publication_year", "to_publication_year"]:
+        return update_year_filter(key, value, user_requirements, session_id)
+
+    return (
+        update_id_filter(key, value, user_requirements, session_id)
+        or "❌ Update failed."
+    )
+
+
+TOPICS_PER_PAGE = 200
+TOPICS_HARVEST_WORKERS = int(os.getenv("TOPICS_HARVEST_WORKERS", "8"))
+TOPICS_SELECT = (
+    "id,display_name,subfield,field,domain,keywords,description,siblings,updated_date"
+)
+topics_meta_path = data_path.with_suffix(".meta.json")
+topics_checkpoint_path = data_path.with_suffix(".checkpoint.json")
+
+
+@with_priority(BACKGROUND)
+def get_topics_version():
+    """Returns the topic count and most recent updated_date on OpenAlex."""
+    api_url = (
+        "https://api.openalex.org/topics"
+        "?sort=updated_date:desc&per_page=1&select=id,updated_date"
+    )
+    data = fetch_data(api_url, param=None, use_cache=False)
+    if not data or not data["results"]:
+        return None
+    return {
+        "count": data["meta"]["count"],
+        "updated_date": data["results"][0]["updated_date"],
+    }
 
-        return (
-            update_id_filter(key, value, user_requirements, fs) or "❌ Update failed."
-        )
 
+def read_json_file(path):
+    """Reads a JSON file, returning None if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as fs:
+            return json.load(fs)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json_file_atomic(path, data):
+    """Writes JSON to a temporary file and atomically moves it into place."""
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as fs:
+        json.dump(data, fs, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def process_topics(results):
+    """Flattens OpenAlex topic records into topics_mapping.csv rows"""
+    rows = []
+    for res in results:
+        rows.append(
+            {
+                "topic_id": strip_openalex_prefix(res["id"]),
+                "topic_name": res["display_name"],
+                "subfield_id": strip_openalex_prefix(res["subfield"]["id"]),
+                "subfield_name": res["subfield"]["display_name"],
+                "field_id": strip_openalex_prefix(res["field"]["id"]),
+                "field_name": res["field"]["display_name"],
+                "domain_id": strip_openalex_prefix(res["domain"]["id"]),
+                "domain_name": res["domain"]["display_name"],
+                "keywords": " , ".join(res["keywords"]),
+                "description": res["description"],
+                "siblings": " , ".join(
+                    [sibling["display_name"] for sibling in res["siblings"]]
+                ),
+            }
+        )
+    return rows
 
-def get_topics():
-    """Fetch All topics in the Database."""
-    filename = "topics_mapping.csv"
-    # Check if the file exists and its last modified date
-    if os.path.exists(filename):
-        last_modified_time = os.path.getmtime(filename)
-        last_modified_date = datetime.fromtimestamp(last_modified_time).date()
 
-        # If file was updated today, do not fetch again
-        if last_modified_date == datetime.today().date():
-            print("Data already fetched today. Skipping API calls.")
+@with_priority(BACKGROUND)
+def fetch_topics_page(page):
+    """Fetches and flattens one page of the topics harvest."""
+    api_url = (
+        f"https://api.openalex.org/topics?select={TOPICS_SELECT}"
+        f"&sort=id&per_page={TOPICS_PER_PAGE}&page={page}"
+    )
+    results = fetch_data(api_url, use_cache=False)
+    if results is None:
+        raise RuntimeError(f"Failed to fetch topics page {page}")
+    return process_topics(results)
+
+
+def get_topics(force=False):
+    """Fetch All topics in the Database.
+    Pages of 200 topics are fetched concurrently, at background priority
+    so user searches are not held up by the rate limiter. Completed pages are
+    checkpointed so an interrupted refresh resumes where it stopped, and the
+    CSV is replaced atomically. Returns False when the local copy is current."""
+    version = get_topics_version()
+    if version is None:
+        logger.error("❌ Could not reach OpenAlex. Keeping existing topics.")
+        return False
+
+    if not force and os.path.exists(data_path):
+        if read_json_file(topics_meta_path) == version:
+            logger.info("Topics are up to date. Skipping API calls.")
             return False  # Indicates no new fetch was done
 
-    topics = []
-    pages = get_page_count("https://api.openalex.org/topics")
-    for page in range(1, pages + 1):
-        print(f"Extracting page {page}")
-        api_url = f"https://api.openalex.org/topics?page={page}"
-        results = fetch_data(api_url)
-        for res in results:
-            row = {}
-            row["topic_id"] = re.sub(r"https://openalex\.org/", "", res["id"])
-            row["topic_name"] = res["display_name"]
-            row["subfield_id"] = re.sub(r"https://openalex\.org/", "", res["id"])
-            row["subfield_name"] = res["subfield"]["display_name"]
-            row["field_id"] = re.sub(r"https://openalex\.org/", "", res["id"])
-            row["field_name"] = res["field"]["display_name"]
-            row["domain_id"] = re.sub(r"https://openalex\.org/", "", res["id"])
-            row["domain_name"] = res["domain"]["display_name"]
-            row["keywords"] = " , ".join(res["keywords"])
-            row["description"] = res["description"]
-            row["siblings"] = " , ".join(
-                [sibling["display_name"] for sibling in res["siblings"]]
-            )
-            topics.append(row)
+    checkpoint = read_json_file(topics_checkpoint_path)
+    if not checkpoint or checkpoint.get("version") != version:
+        checkpoint = {"version": version, "pages": {}}
+
+    pages = -(-version["count"] // TOPICS_PER_PAGE)
+    pending = [p for p in range(1, pages + 1) if str(p) not in checkpoint["pages"]]
+    logger.info("Harvesting %s of %s topic pages", len(pending), pages)
+
+    failed = []
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=TOPICS_HARVEST_WORKERS) as executor:
+        futures = {executor.submit(fetch_topics_page, p): p for p in pending}
+        for future in as_completed(futures):
+            page = futures[future]
+            try:
+                rows = future.result()
+            except RuntimeError as e:
+                logger.error("❌ %s", e)
+                failed.append(page)
+                continue
+            with lock:
+                checkpoint["pages"][str(page)] = rows
+                write_json_file_atomic(topics_checkpoint_path, checkpoint)
+            logger.info("Extracted page %s", page)
+
+    if failed:
+        logger.error(
+            "❌ %s pages failed. Run again to resume the harvest.", len(failed)
+        )
+        return False
+
+    topics = [
+        row
+        for page in sorted(checkpoint["pages"], key=int)
+        for row in checkpoint["pages"][page]
+    ]
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
     topics_df = pd.DataFrame(topics)
-    topics_df.to_csv(filename, index=False, encoding="utf-8")
+    tmp_path = data_path.with_name(f"{data_path.name}.tmp")
+    topics_df.to_csv(tmp_path, index=False, encoding="utf-8")
+    os.replace(tmp_path, data_path)
+    write_json_file_atomic(topics_meta_path, version)
+    if os.path.exists(topics_checkpoint_path):
+        os.remove(topics_checkpoint_path)
 
-    print("Data successfully saved to topics_mapping.csv")
+    logger.info("Data successfully saved to topics_mapping.csv")
 
     return True
 
@@ -397,50 +899,144 @@ def get_topics():
 # print(get_topics())
 
 
+# Works resolved per request by the batched details lookup
+WORK_DETAILS_BATCH_SIZE = 50
+WORK_DETAILS_SELECT_FIELDS = [
+    "id",
+    "doi",
+    "display_name",
+    "publication_year",
+    "publication_date",
+    "authorships",
+    "primary_topic",
+    "best_oa_location",
+    "abstract_inverted_index",
+]
+DOI_PATTERN = re.compile(r"^(?:https?://(?:dx\.)?doi\.org/|doi:)?(10\.\S+)$", re.I)
+WORK_ID_PATTERN = re.compile(r"^(?:https?://openalex\.org/)?(W\d+)$", re.I)
+
+
 def get_work_details(work_id):
     """Get details for a specified work_id"""
-    api_url = f"https://api.openalex.org/works/{work_id.upper()}"
-    result = fetch_data(api_url, param=None)
+    return get_works_details([work_id])[0]
+
+
+def get_works_details(work_ids):
+    """Get details for a list of OpenAlex work IDs and/or DOIs.
+    IDs are looked up WORK_DETAILS_BATCH_SIZE at a time with an
+    ids.openalex (or doi) OR-filter, and the chunks are fetched
+    concurrently. Results come back in input order; an ID that could not be
+    resolved gets an entry with an error instead of details."""
+    lookups = [parse_work_reference(work_id) for work_id in work_ids]
+    urls = build_work_details_urls(lookups)
+
+    futures = [
+        search_executor.submit(bind_context(fetch_data), api_url, None)
+        for api_url in urls
+    ]
+    found, failed = {}, False
+    for future in futures:
+        data = future.result()
+        if data is None:
+            failed = True
+            continue
+        # Single-work URLs return the work itself rather than a results list
+        results = data.get("results", [data])
+        for result in results:
+            index_work_details(found, result)
+        record_works(results)
+
+    return [
+        match_work_details(work_id, lookup, found, failed)
+        for work_id, lookup in zip(work_ids, lookups)
+    ]
+
+
+def parse_work_reference(work_id):
+    """Returns the (filter field, value) that identifies a work ID or DOI,
+    or None if it is neither."""
+    work_id = str(work_id).strip()
+    match = WORK_ID_PATTERN.match(work_id)
+    if match:
+        return "ids.openalex", match.group(1).upper()
+    match = DOI_PATTERN.match(work_id)
+    if match:
+        return "doi", match.group(1).lower()
+    return None
+
+
+def build_work_details_urls(lookups):
+    """Builds the batched filter URLs for a list of parsed work references."""
+    values = {"ids.openalex": [], "doi": []}
+    urls = []
+    for field, value in dict.fromkeys(filter(None, lookups)):
+        # Commas and pipes would split an OR-filter, so such DOIs go alone.
+        # Values are URL-encoded, as DOIs may contain &, # or +.
+        encoded = quote(value, safe="/")
+        if set(value) & {",", "|"}:
+            urls.append(f"https://api.openalex.org/works/https://doi.org/{encoded}")
+        else:
+            values[field].append(encoded)
+
+    for field, field_values in values.items():
+        for start in range(0, len(field_values), WORK_DETAILS_BATCH_SIZE):
+            chunk = field_values[start : start + WORK_DETAILS_BATCH_SIZE]
+            urls.append(
+                f"https://api.openalex.org/works"
+                f"?filter={field}:{'|'.join(chunk)}"
+                f"&select={','.join(WORK_DETAILS_SELECT_FIELDS)}"
+                f"&per_page={WORK_DETAILS_BATCH_SIZE}"
+            )
+    return urls
+
+
+def index_work_details(found, result):
+    """Adds a raw work to the lookup table by its OpenAlex ID and DOI."""
+    work = process_work_details(result)
+    found[("ids.openalex", work["id"].upper())] = work
+    match = DOI_PATTERN.match(work["doi"] or "")
+    if match:
+        found[("doi", match.group(1).lower())] = work
+
+
+def match_work_details(work_id, lookup, found, failed):
+    """Returns the details found for one requested ID, or an explicit miss."""
+    if lookup is None:
+        return {"requested": work_id, "error": "Not an OpenAlex work ID or DOI."}
+    if lookup in found:
+        return found[lookup]
+    if failed:
+        return {"requested": work_id, "error": "OpenAlex fetch failed."}
+    return {"requested": work_id, "error": "Work not found."}
+
+
+def process_work_details(result):
+    """Extracts the detailed metadata of a single work.
+    Missing or null fields are tolerated and left out or empty."""
     work = {}
-    work["id"] = re.sub(r"https://openalex\.org/", "", result["id"])
-    work["doi"] = result["doi"]
-    work["name"] = result["display_name"]
-    work["publication_year"] = result["publication_year"]
-    work["publication_date"] = result["publication_date"]
+    work["id"] = strip_openalex_prefix(result.get("id"))
+    work["doi"] = result.get("doi")
+    work["name"] = result.get("display_name")
+    work["publication_year"] = result.get("publication_year")
+    work["publication_date"] = result.get("publication_date")
     authors = []
-    for author in result["authorships"]:
-        authors.append(author["author"]["display_name"])
+    for authorship in result.get("authorships") or []:
+        author = authorship.get("author") or {}
+        if author.get("display_name"):
+            authors.append(author["display_name"])
     work["authors"] = " , ".join(authors)
-    work["primary_topic_id"] = re.sub(
-        r"https://openalex\.org/", "", result["primary_topic"]["id"]
-    )
-    work["primary_topic_name"] = result["primary_topic"]["display_name"]
-    if result["best_oa_location"]:
-        if result["best_oa_location"]["is_oa"]:
-            work["landing_page_url"] = result["best_oa_location"]["landing_page_url"]
-            work["pdf_url"] = result["best_oa_location"]["pdf_url"]
-            work["source_type"] = result["source"]["type"]
-            work["version"] = result["ver sion"]
+    primary_topic = result.get("primary_topic") or {}
+    work["primary_topic_id"] = strip_openalex_prefix(primary_topic.get("id"))
+    work["primary_topic_name"] = primary_topic.get("display_name")
+    location = result.get("best_oa_location") or {}
+    if location.get("is_oa"):
+        work["landing_page_url"] = location.get("landing_page_url")
+        work["pdf_url"] = location.get("pdf_url")
+        if location.get("source"):
+            work["source_type"] = location["source"].get("type")
+        work["version"] = location.get("version")
     return work
 
 
-def initialise_requirements_dictionary():
-    """Initialises the User Requirements dictionary"""
-    return {
-        "keywords": [],
-        "sort_by": "relevance_score",
-        "has_open_access": False,
-        "filters": {
-            "primary_topic_id": "",
-            "author_id": "",
-            "institution_id": "",
-            "work_id": "",
-            "doi": "",
-            "from_publication_year": "",
-            "to_publication_year": "",
-        },
-    }
-
-
 # For debugging and testing
 # print(get_work_details("W4320920036"))
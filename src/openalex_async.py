@@ -0,0 +1,371 @@
+"""Async OpenAlex Services"""
+
+import asyncio
+import logging
+import os
+import weakref
+import httpx
+from openalex import (
+    DEFAULT_SESSION_ID,
+    TOPIC_RECOMMENDER_MODE,
+    prefetch_topic_searches,
+    build_fanout_urls,
+    build_page_fetcher,
+    build_work_details_urls,
+    close_search_pager,
+    construct_group_by_api_url,
+    fuse_results_page,
+    format_topic_recommendations,
+    get_local_topic_groups,
+    get_requirements_store,
+    index_work_details,
+    is_validated_entity,
+    match_work_details,
+    merge_topic_groups,
+    process_groups,
+    process_results,
+    parse_doi_filter,
+    parse_id_filter,
+    parse_work_reference,
+    parse_year_filter,
+    remember_validated_entity,
+    save_user_requirements,
+    show_search,
+    use_fanout,
+)
+from openalex_client import (
+    BACKOFF_FACTOR,
+    MAX_RETRIES,
+    OPENALEX_MAILTO,
+    POOL_SIZE,
+    RETRY_STATUS_CODES,
+    get_timeout,
+    rate_limiter,
+    request_span,
+    strip_openalex_prefix,
+    with_mailto,
+)
+from tracing import span
+from response_cache import get_response_cache, get_ttl, normalize_url
+from tool_output import encode_works
+from topic_prefetch import take_prefetched_search
+from works_pager import WorksPager
+from works_store import record_works
+from single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on OpenAlex requests in flight at once from one event loop
+MAX_CONCURRENT_REQUESTS = int(os.getenv("OPENALEX_MAX_CONCURRENT_REQUESTS", "20"))
+
+# httpx clients and semaphores are bound to the event loop that created them
+_loop_resources = weakref.WeakKeyDictionary()
+# Kept apart from the synchronous client's, whose callers expect requests errors
+inflight_requests_async = SingleFlight()
+
+
+def get_async_client():
+    """Returns the pooled httpx client and request semaphore of the running loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _loop_resources:
+        headers = {"Accept": "application/json"}
+        if OPENALEX_MAILTO:
+            headers["User-Agent"] = f"SAIRA (mailto:{OPENALEX_MAILTO})"
+        client = httpx.AsyncClient(
+            headers=headers,
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE
+            ),
+        )
+        _loop_resources[loop] = (client, asyncio.Semaphore(MAX_CONCURRENT_REQUESTS))
+    return _loop_resources[loop]
+
+
+async def close_async_client():
+    """Closes the httpx client of the running loop."""
+    resources = _loop_resources.pop(asyncio.get_running_loop(), None)
+    if resources is not None:
+        await resources[0].aclose()
+
+
+def get_retry_delay(response, attempt):
+    """Returns the Retry-After delay of a response, or exponential backoff."""
+    retry_after = response.headers.get("Retry-After") if response else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return BACKOFF_FACTOR * (2**attempt)
+
+
+async def request_json_async(api_url):
+    """GETs an OpenAlex URL through the pooled async client and returns its
+    JSON body. Retries on 429 and 5xx responses and on transport errors
+    (timeouts, dropped connections) with exponential backoff, honouring
+    Retry-After. Raises httpx.HTTPError on failure."""
+    with request_span("openalex.http", api_url) as http_span:
+        future, leader = inflight_requests_async.begin(api_url)
+        http_span.set(coalesced=not leader)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            data = await send_request_async(api_url, http_span)
+        except BaseException as e:
+            inflight_requests_async.finish(api_url, future, error=e)
+            raise
+        inflight_requests_async.finish(api_url, future, data)
+        return data
+
+
+async def send_request_async(api_url, http_span):
+    """Makes the HTTP request, taking a rate-limiter token before every
+    attempt. The token is waited for on a worker thread, since the
+    limiter is shared with the synchronous client."""
+    client, semaphore = get_async_client()
+    connect, read = get_timeout(api_url)
+    timeout = httpx.Timeout(read, connect=connect)
+    waited = 0.0
+    for attempt in range(MAX_RETRIES + 1):
+        waited += await asyncio.to_thread(rate_limiter.acquire)
+        try:
+            async with semaphore:
+                response = await client.get(with_mailto(api_url), timeout=timeout)
+        except httpx.TransportError:
+            if attempt == MAX_RETRIES:
+                http_span.set(attempts=attempt + 1)
+                raise
+            await asyncio.sleep(get_retry_delay(None, attempt))
+            continue
+        if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+            break
+        await asyncio.sleep(get_retry_delay(response, attempt))
+    http_span.set(
+        status=response.status_code,
+        bytes=len(response.content),
+        attempts=attempt + 1,
+        rate_limit_wait_ms=round(waited * 1000, 3),
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+async def fetch_data_async(api_url, param="results", use_cache=True):
+    """Fetches data from a specified endpoint without blocking the event loop.
+    Shares the response cache with the synchronous fetch_data."""
+    with request_span("openalex.fetch", api_url) as fetch_span:
+        cache = get_response_cache()
+        cache_key = normalize_url(api_url)
+        data = cache.get(cache_key) if use_cache else None
+        fetch_span.set(cache_hit=data is not None)
+        if data is not None:
+            return data[param] if param else data
+        try:
+            data = await request_json_async(api_url)
+            cache.set(cache_key, data, get_ttl(api_url))
+            return data[param] if param else data
+        except httpx.HTTPError as e:
+            logger.error("Error fetching data: %s", e)
+            fetch_span.set(error=str(e))
+            return None
+
+
+async def get_research_papers_async(
+    keywords, sort_by, has_open_access, session_id=DEFAULT_SESSION_ID
+):
+    """Async variant of openalex.get_research_papers."""
+    logger.info("🔍 Fetching research papers...")
+    save_user_requirements(
+        session_id,
+        {
+            "keywords": list(
+                {keyword.strip(" ,\t\n\r") for keyword in keywords.lower().split()}
+            ),
+            "sort_by": sort_by,
+            "has_open_access": has_open_access,
+        },
+    )
+    user_requirements = get_requirements_store().get(session_id)
+    return await search_works_async(user_requirements, session_id)
+
+
+async def search_works_async(user_requirements, session_id=DEFAULT_SESSION_ID):
+    """Async variant of openalex.search_works."""
+    output, pager = await run_works_search_async(user_requirements, session_id)
+    if pager is not None:
+        show_search(session_id, pager)
+    return output
+
+
+async def run_works_search_async(user_requirements, session_id=None):
+    """Async variant of openalex.run_works_search. The first page is fetched
+    on the event loop; later pages are prefetched by the session pager."""
+    if user_requirements["filters"]["primary_topic_id"] == "":
+        keywords_query = "%20".join(user_requirements["keywords"])
+        groups = await get_topic_groups_async(
+            keywords_query,
+            user_requirements["has_open_access"],
+            filters=user_requirements["filters"],
+        )
+        prefetch_topic_searches(user_requirements, groups, session_id)
+        return format_topic_recommendations(groups), None
+
+    api_url, fetch_page = build_page_fetcher(user_requirements)
+    logger.info("🌐 API URL constructed: %s", api_url)
+
+    prefetched = take_prefetched_search(session_id, api_url)
+    page = await asyncio.wrap_future(prefetched) if prefetched else None
+    if page is None and use_fanout(user_requirements):
+        page = await fetch_fused_page_async(build_fanout_urls(user_requirements))
+        if page is None:
+            return "❌ API fetch failed.", None
+    elif page is None:
+        data = await fetch_data_async(f"{api_url}&cursor=*", param=None)
+        if data is None:
+            return "❌ API fetch failed.", None
+        page = process_results(data["results"]), data["meta"].get("next_cursor")
+    logger.info("📦 Data fetched from OpenAlex API.")
+
+    pager = WorksPager(fetch_page)
+    works = pager.serve_fetched(page)
+    logger.info("✅ All results processed. Converting to JSON.")
+    return encode_works(works), pager
+
+
+async def fetch_fused_page_async(api_urls, cursor="*"):
+    """Async variant of openalex.fetch_fused_page, for the first page."""
+    with span("openalex.fanout", variants=len(api_urls)):
+        responses = await asyncio.gather(
+            *(
+                fetch_data_async(f"{api_url}&cursor=*", param=None)
+                for api_url in api_urls
+            )
+        )
+        return fuse_results_page(responses, cursor)
+
+
+async def get_remote_topic_groups_async(keywords_query, has_open_access, filters=None):
+    """Async variant of openalex.get_remote_topic_groups."""
+    api_url = construct_group_by_api_url(
+        keywords_query, "primary_topic.id", has_open_access, filters
+    )
+    logger.info("🌐 API URL constructed: %s", api_url)
+    results = await fetch_data_async(api_url, param="group_by")
+    logger.info("📦 Data fetched from OpenAlex API.")
+    return process_groups(results or [])
+
+
+async def recommend_relevant_topics_async(
+    keywords_query, has_open_access, mode=None, filters=None
+):
+    """Async variant of openalex.recommend_relevant_topics."""
+    groups = await get_topic_groups_async(
+        keywords_query, has_open_access, mode, filters
+    )
+    return format_topic_recommendations(groups)
+
+
+async def get_topic_groups_async(
+    keywords_query, has_open_access, mode=None, filters=None
+):
+    """Async variant of openalex.get_topic_groups. Local ranking runs in
+    process; only the remote group_by query awaits the network."""
+    mode = mode or TOPIC_RECOMMENDER_MODE
+    groups = get_local_topic_groups(keywords_query) if mode != "remote" else None
+
+    if not groups:
+        groups = await get_remote_topic_groups_async(
+            keywords_query, has_open_access, filters
+        )
+    elif mode == "hybrid":
+        remote_groups = await get_remote_topic_groups_async(
+            keywords_query, has_open_access, filters
+        )
+        groups = merge_topic_groups(groups, remote_groups)
+
+    logger.info("✅ All results processed. Converting to JSON.")
+    return groups
+
+
+async def validate_entity_async(api_url, entity_id):
+    """Async variant of openalex.validate_entity."""
+    results = await fetch_data_async(api_url, param="")
+    return bool(results and strip_openalex_prefix(results.get("id")) == entity_id)
+
+
+async def update_user_requirements_async(key, value, session_id=DEFAULT_SESSION_ID):
+    """Async variant of openalex.update_user_requirements. ID validation and
+    the filtered search run concurrently on the event loop."""
+    user_requirements = get_requirements_store().get(session_id)
+
+    if key not in user_requirements["filters"] and key != "doi":
+        return "❌ Invalid key."
+
+    if key == "doi":
+        doi, api_url = parse_doi_filter(value)
+        results = await fetch_data_async(api_url, param="")
+        if not results:
+            return "❌ DOI not found or invalid."
+        save_user_requirements(session_id, {"filters.doi": doi})
+        logger.info("✅ DOI updated successfully.")
+        return results
+
+    if key in ["from_publication_year", "to_publication_year"]:
+        year, error = parse_year_filter(value)
+        if error:
+            return error
+        save_user_requirements(session_id, {f"filters.{key}": year})
+        logger.info("✅ %s updated to %s.", key, year)
+        user_requirements["filters"][key] = year
+        return await search_works_async(user_requirements, session_id)
+
+    parsed = parse_id_filter(value)
+    if parsed is None:
+        return "❌ Update failed."
+
+    api_url, label = parsed
+    user_requirements["filters"][key] = value
+    if is_validated_entity(value):
+        search = None
+    else:
+        # The speculative search runs without the session, as in the sync
+        # variant, so an invalid ID leaves the session's prefetches alone.
+        search = asyncio.ensure_future(run_works_search_async(user_requirements, None))
+        if not await validate_entity_async(api_url, value):
+            search.cancel()
+            search.add_done_callback(close_search_pager)
+            return "❌ Invalid ID or API fetch failed."
+        remember_validated_entity(value)
+
+    save_user_requirements(session_id, {f"filters.{key}": value})
+    logger.info("✅ %s updated successfully.", label)
+    if search is None:
+        output, pager = await run_works_search_async(user_requirements, session_id)
+    else:
+        output, pager = await search
+    if pager is not None:
+        show_search(session_id, pager)
+    return output
+
+
+async def get_work_details_async(work_id):
+    """Async variant of openalex.get_work_details."""
+    return (await get_works_details_async([work_id]))[0]
+
+
+async def get_works_details_async(work_ids):
+    """Async variant of openalex.get_works_details. The batched chunks are
+    fetched concurrently on the event loop."""
+    lookups = [parse_work_reference(work_id) for work_id in work_ids]
+    urls = build_work_details_urls(lookups)
+    pages = await asyncio.gather(
+        *(fetch_data_async(api_url, param=None) for api_url in urls)
+    )
+    found = {}
+    for data in pages:
+        results = data.get("results", [data]) if data else []
+        for result in results:
+            index_work_details(found, result)
+        record_works(results)
+    failed = any(data is None for data in pages)
+    return [
+        match_work_details(work_id, lookup, found, failed)
+        for work_id, lookup in zip(work_ids, lookups)
+    ]
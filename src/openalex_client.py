@@ -0,0 +1,154 @@
+"""OpenAlex HTTP Client"""
+
+import os
+import threading
+from functools import partial
+from urllib.parse import parse_qsl, urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from dotenv import load_dotenv
+from tracing import is_enabled, span
+from rate_limiter import PriorityRateLimiter
+from single_flight import SingleFlight
+
+load_dotenv()
+
+OPENALEX_BASE_URL = "https://api.openalex.org"
+
+# Polite pool: OpenAlex routes requests carrying a contact email to faster servers
+OPENALEX_MAILTO = os.getenv("OPENALEX_MAILTO", "")
+
+POOL_SIZE = int(os.getenv("OPENALEX_POOL_SIZE", "10"))
+MAX_RETRIES = int(os.getenv("OPENALEX_MAX_RETRIES", "3"))
+BACKOFF_FACTOR = float(os.getenv("OPENALEX_BACKOFF_FACTOR", "0.5"))
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# (connect, read) timeouts in seconds, keyed by the first path segment
+DEFAULT_TIMEOUT = (3.05, 10)
+ENDPOINT_TIMEOUTS = {
+    "works": (3.05, 20),
+    "topics": (3.05, 15),
+    "authors": (3.05, 10),
+    "institutions": (3.05, 10),
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+# Shared by every session, so the process as a whole stays within the limit
+rate_limiter = PriorityRateLimiter()
+inflight_requests = SingleFlight()
+
+
+def create_session():
+    """Creates a pooled, retrying session for OpenAlex requests."""
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    if OPENALEX_MAILTO:
+        session.headers.update({"User-Agent": f"SAIRA (mailto:{OPENALEX_MAILTO})"})
+    return session
+
+
+def get_session():
+    """Returns the process-wide OpenAlex session, creating it on first use."""
+    global _session  # pylint: disable=global-statement
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def with_mailto(api_url):
+    """Adds the polite-pool mailto parameter to an OpenAlex URL."""
+    if not OPENALEX_MAILTO:
+        return api_url
+    if "mailto=" in urlsplit(api_url).query:
+        return api_url
+    separator = "&" if "?" in api_url else "?"
+    return f"{api_url}{separator}mailto={OPENALEX_MAILTO}"
+
+
+def get_endpoint(api_url):
+    """Returns the OpenAlex endpoint name (works, topics, ...) of a URL."""
+    path = urlsplit(api_url).path.strip("/")
+    return path.split("/", 1)[0] if path else ""
+
+
+def strip_openalex_prefix(openalex_id):
+    """Strips the https://openalex.org/ prefix from an OpenAlex ID,
+    returning "" for None."""
+    return openalex_id.removeprefix("https://openalex.org/") if openalex_id else ""
+
+
+def get_url_template(api_url):
+    """Returns the endpoint and query parameter names of a URL, without
+    IDs or values, so spans of the same kind of request can be grouped."""
+    parts = urlsplit(api_url)
+    segments = parts.path.strip("/").split("/")
+    path = segments[0] + ("/{id}" if len(segments) > 1 else "")
+    keys = dict.fromkeys(key for key, _ in parse_qsl(parts.query, True))
+    return f"/{path}?{'&'.join(keys)}" if keys else f"/{path}"
+
+
+def request_span(name, api_url):
+    """Opens a span for an OpenAlex request. The URL template is only
+    worked out while tracing is enabled, as nothing reads it otherwise."""
+    if not is_enabled():
+        return span(name)
+    return span(name, url_template=get_url_template(api_url))
+
+
+def get_timeout(api_url):
+    """Returns the (connect, read) timeout for the endpoint of a URL."""
+    return ENDPOINT_TIMEOUTS.get(get_endpoint(api_url), DEFAULT_TIMEOUT)
+
+
+def request_json(api_url):
+    """GETs an OpenAlex URL through the pooled session and returns its JSON body.
+    Retries on 429 and 5xx responses with exponential backoff, honouring
+    Retry-After. Raises requests.exceptions.RequestException on failure.
+    Identical requests made at the same moment share one HTTP call, and
+    each call first takes a token from the process-wide rate limiter."""
+    with request_span("openalex.http", api_url) as http_span:
+        data, shared = inflight_requests.do(
+            api_url, partial(send_request, api_url, http_span)
+        )
+        http_span.set(coalesced=shared)
+        return data
+
+
+def send_request(api_url, http_span):
+    """Waits for a rate-limiter token, then makes the HTTP request."""
+    waited = rate_limiter.acquire()
+    response = get_session().get(with_mailto(api_url), timeout=get_timeout(api_url))
+    http_span.set(
+        status=response.status_code,
+        bytes=len(response.content),
+        rate_limit_wait_ms=round(waited * 1000, 3),
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def get_request_metrics():
+    """Returns the rate limiter's queue and wait metrics and the
+    single-flight counts of the synchronous client."""
+    return {
+        "rate_limiter": rate_limiter.metrics(),
+        "single_flight": inflight_requests.metrics(),
+    }
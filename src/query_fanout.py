@@ -0,0 +1,85 @@
+"""Query Fan-out Services"""
+
+import os
+
+# 'auto' fans out relevance searches with many keywords, 'off' never does
+SEARCH_FANOUT = os.getenv("SEARCH_FANOUT", "auto")
+# Keyword count from which one joined search= string loses too much recall
+FANOUT_MIN_KEYWORDS = int(os.getenv("FANOUT_MIN_KEYWORDS", "4"))
+# Searches issued per fan-out, including the one over every keyword
+FANOUT_VARIANTS = int(os.getenv("FANOUT_VARIANTS", "4"))
+FANOUT_SUBSET_SIZE = int(os.getenv("FANOUT_SUBSET_SIZE", "3"))
+# Works fetched per variant; the fused list is at most this times FANOUT_VARIANTS,
+# after which paging continues through the all-keywords search
+FANOUT_PER_PAGE = min(int(os.getenv("FANOUT_PER_PAGE", "25")), 200)
+# Reciprocal rank fusion constant; larger values flatten the rank curve
+RRF_K = 60
+
+
+def build_keyword_variants(keywords):
+    """Returns the keyword lists searched by a fan-out: all keywords, then
+    overlapping subsets of FANOUT_SUBSET_SIZE spread evenly around the
+    keyword list so every keyword appears in at least one subset when
+    there are enough variants. Keywords are sorted so the same set always
+    gives the same URLs, and the response cache can serve them."""
+    keywords = sorted(keywords)
+    variants = [keywords]
+    count = min(FANOUT_VARIANTS - 1, len(keywords))
+    size = min(FANOUT_SUBSET_SIZE, len(keywords) - 1)
+    for i in range(count if size > 0 else 0):
+        start = round(i * len(keywords) / count)
+        subset = sorted(keywords[(start + j) % len(keywords)] for j in range(size))
+        if subset not in variants:
+            variants.append(subset)
+    return variants
+
+
+def reciprocal_rank(rank, k=RRF_K):
+    """Returns the reciprocal rank fusion score, 1 / (k + rank), of a
+    1-based rank or an array of ranks."""
+    return 1.0 / (k + rank)
+
+
+def work_keys(result):
+    """Returns the identities a raw work is deduplicated by: ID and DOI."""
+    keys = [("id", result.get("id"))]
+    if result.get("doi"):
+        keys.append(("doi", result["doi"].lower()))
+    return keys
+
+
+def reciprocal_rank_fusion(ranked_lists, k=RRF_K):
+    """Merges ranked lists of raw works into one list ordered by
+    reciprocal rank fusion, score(w) = sum of 1 / (k + rank of w).
+    A work is the same work in every list if its ID or DOI matches; it is
+    counted once per list, at its best rank. Scores are summed with one
+    np.bincount over all (work, rank) pairs. Returns (works, scores)."""
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    index_of, works = {}, []
+    work_indices, ranks = [], []
+    for results in ranked_lists:
+        seen = set()
+        for rank, result in enumerate(results, start=1):
+            keys = work_keys(result)
+            index = next((index_of[key] for key in keys if key in index_of), None)
+            if index is None:
+                index = len(works)
+                works.append(result)
+            for key in keys:
+                index_of.setdefault(key, index)
+            if index not in seen:
+                seen.add(index)
+                work_indices.append(index)
+                ranks.append(rank)
+
+    if not works:
+        return [], np.empty(0)
+    scores = np.bincount(
+        np.asarray(work_indices),
+        weights=reciprocal_rank(np.asarray(ranks, dtype=float), k),
+        minlength=len(works),
+    )
+    # Stable, so ties keep the order of the all-keywords search
+    order = np.argsort(-scores, kind="stable")
+    return [works[i] for i in order], scores[order]
@@ -0,0 +1,125 @@
+"""Rate Limiting Services"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from functools import wraps
+
+# OpenAlex allows about 10 requests per second; 0 turns the limiter off
+OPENALEX_RATE_LIMIT = float(os.getenv("OPENALEX_RATE_LIMIT", "10"))
+OPENALEX_RATE_BURST = int(os.getenv("OPENALEX_RATE_BURST", "10"))
+
+# Lower values are served first
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_request_priority = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+
+class PriorityRateLimiter:
+    """A token bucket shared by every session in the process. Requests
+    that find it empty queue by priority, then arrival order, so
+    interactive searches go ahead of background jobs. Queue depth and
+    wait times are kept per priority for metrics()."""
+
+    def __init__(self, rate=OPENALEX_RATE_LIMIT, burst=OPENALEX_RATE_BURST):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+        self._stats = {
+            priority: {
+                "queue_depth": 0,
+                "max_queue_depth": 0,
+                "requests": 0,
+                "total_wait": 0.0,
+                "max_wait": 0.0,
+            }
+            for priority in PRIORITY_NAMES
+        }
+
+    def _refill(self):
+        """Adds the tokens earned since the last refill, up to the burst size."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority=None):
+        """Blocks until a token is free for this request and returns the
+        seconds spent waiting. Only the head of the queue waits on the
+        clock; the others sleep until it has taken its token."""
+        if self.rate <= 0:
+            return 0.0
+        priority = current_priority() if priority is None else priority
+        started = time.monotonic()
+        ticket = (priority, next(self._arrivals))
+        stats = self._stats[priority]
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            stats["queue_depth"] += 1
+            stats["max_queue_depth"] = max(
+                stats["max_queue_depth"], stats["queue_depth"]
+            )
+            while True:
+                self._refill()
+                if self._waiters[0] == ticket:
+                    if self._tokens >= 1:
+                        break
+                    self._condition.wait((1 - self._tokens) / self.rate)
+                else:
+                    self._condition.wait()
+            self._tokens -= 1
+            heapq.heappop(self._waiters)
+            waited = time.monotonic() - started
+            stats["queue_depth"] -= 1
+            stats["requests"] += 1
+            stats["total_wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+            self._condition.notify_all()
+        return waited
+
+    def metrics(self):
+        """Returns queue depth and wait-time metrics per priority."""
+        with self._condition:
+            return {
+                PRIORITY_NAMES[priority]: {
+                    "queue_depth": stats["queue_depth"],
+                    "max_queue_depth": stats["max_queue_depth"],
+                    "requests": stats["requests"],
+                    "mean_wait_ms": round(
+                        1000 * stats["total_wait"] / max(stats["requests"], 1), 3
+                    ),
+                    "max_wait_ms": round(1000 * stats["max_wait"], 3),
+                }
+                for priority, stats in self._stats.items()
+            }
+
+
+def current_priority():
+    """Returns the priority OpenAlex requests are queued at in this context."""
+    return _request_priority.get()
+
+
+def with_priority(priority):
+    """Decorates a function so the OpenAlex requests it makes on its own
+    thread are queued at priority."""
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            token = _request_priority.set(priority)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _request_priority.reset(token)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,166 @@
+"""User Requirements Store"""
+
+import abc
+import copy
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from constants import BASE_DIR
+from tracing import traced
+
+# 'memory' keeps requirements in process, 'sqlite' persists them row by row
+REQUIREMENTS_STORE = os.getenv("REQUIREMENTS_STORE", "memory")
+REQUIREMENTS_DB_PATH = os.getenv(
+    "REQUIREMENTS_DB_PATH", str(BASE_DIR / "src" / ".cache" / "requirements.sqlite")
+)
+# Upper bound on sessions held by the in-memory store
+MAX_SESSIONS = int(os.getenv("REQUIREMENTS_MAX_SESSIONS", "1000"))
+
+DEFAULT_SESSION_ID = "default"
+
+
+def initialise_requirements_dictionary():
+    """Initialises the User Requirements dictionary"""
+    return {
+        "keywords": [],
+        "sort_by": "relevance_score",
+        "has_open_access": False,
+        "filters": {
+            "primary_topic_id": "",
+            "author_id": "",
+            "institution_id": "",
+            "work_id": "",
+            "doi": "",
+            "from_publication_year": "",
+            "to_publication_year": "",
+        },
+    }
+
+
+def apply_changes(user_requirements, changes):
+    """Applies flat changes such as {'sort_by': ..., 'filters.doi': ...}."""
+    for field, value in changes.items():
+        if field.startswith("filters."):
+            user_requirements["filters"][field.removeprefix("filters.")] = value
+        else:
+            user_requirements[field] = value
+    return user_requirements
+
+
+class RequirementsStore(abc.ABC):
+    """Interface for per-session user requirements storage.
+    get() always returns a private copy, so callers may modify it freely;
+    changes only take effect through update() or reset()."""
+
+    @abc.abstractmethod
+    def get(self, session_id):
+        """Returns the requirements dictionary of a session."""
+
+    @abc.abstractmethod
+    def update(self, session_id, changes):
+        """Applies flat field changes to a session's requirements."""
+
+    @abc.abstractmethod
+    def reset(self, session_id):
+        """Restores a session's requirements to the defaults."""
+
+
+class InMemoryRequirementsStore(RequirementsStore):
+    """Keeps requirements in a process-local dictionary keyed by session.
+    The least recently used sessions are dropped beyond max_sessions."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id):
+        """Returns the live requirements of a session, creating them if needed."""
+        if session_id not in self._sessions:
+            self._sessions[session_id] = initialise_requirements_dictionary()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        return self._sessions[session_id]
+
+    @traced("requirements.get")
+    def get(self, session_id):
+        with self._lock:
+            return copy.deepcopy(self._session(session_id))
+
+    @traced("requirements.update")
+    def update(self, session_id, changes):
+        with self._lock:
+            apply_changes(self._session(session_id), copy.deepcopy(changes))
+
+    @traced("requirements.reset")
+    def reset(self, session_id):
+        with self._lock:
+            self._sessions[session_id] = initialise_requirements_dictionary()
+            self._sessions.move_to_end(session_id)
+
+
+class SQLiteRequirementsStore(RequirementsStore):
+    """Persists requirements in SQLite with one row per session and field,
+    so an update writes only the fields it changes."""
+
+    def __init__(self, db_path=REQUIREMENTS_DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS user_requirements ("
+                "session_id TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (session_id, field))"
+            )
+
+    @traced("requirements.get")
+    def get(self, session_id):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT field, value FROM user_requirements WHERE session_id = ?",
+                (session_id,),
+            ).fetchall()
+        changes = {field: json.loads(value) for field, value in rows}
+        return apply_changes(initialise_requirements_dictionary(), changes)
+
+    @traced("requirements.update")
+    def update(self, session_id, changes):
+        rows = [
+            (session_id, field, json.dumps(value, ensure_ascii=False))
+            for field, value in changes.items()
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO user_requirements (session_id, field, value) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+
+    @traced("requirements.reset")
+    def reset(self, session_id):
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM user_requirements WHERE session_id = ?", (session_id,)
+            )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_requirements_store():
+    """Returns the process-wide requirements store selected by REQUIREMENTS_STORE."""
+    global _store  # pylint: disable=global-statement
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if REQUIREMENTS_STORE == "sqlite":
+                    _store = SQLiteRequirementsStore(REQUIREMENTS_DB_PATH)
+                else:
+                    _store = InMemoryRequirementsStore(MAX_SESSIONS)
+    return _store
@@ -0,0 +1,208 @@
+"""Response Cache Services"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from constants import BASE_DIR
+from openalex_client import get_endpoint
+
+CACHE_SIZE = int(os.getenv("OPENALEX_CACHE_SIZE", "512"))
+# Set to a file path (e.g. src/.cache/openalex.sqlite) to persist across restarts
+CACHE_PATH = os.getenv("OPENALEX_CACHE_PATH", "")
+# Upper bound on rows kept in the SQLite store; the soonest to expire go first
+CACHE_MAX_ROWS = int(os.getenv("OPENALEX_CACHE_MAX_ROWS", "20000"))
+
+# Time-to-live in seconds. Topics and entity lookups change rarely,
+# works searches are kept short so new publications show up.
+DEFAULT_TTL = 60 * 60
+WORKS_SEARCH_TTL = 15 * 60
+ENTITY_TTL = 24 * 60 * 60
+TOPICS_TTL = 7 * 24 * 60 * 60
+
+
+class ResponseCache:
+    """Thread-safe in-memory LRU cache with per-entry TTL and an optional
+    SQLite store that survives restarts. The in-memory lock never covers
+    disk I/O: SQLite reads take their own lock, and writes go through one
+    background thread that also drops expired rows and rows beyond max_rows."""
+
+    def __init__(
+        self, maxsize=CACHE_SIZE, db_path="", table="responses", max_rows=CACHE_MAX_ROWS
+    ):
+        self.maxsize = maxsize
+        self.table = table
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db_lock = threading.Lock()
+            self._writer = ThreadPoolExecutor(max_workers=1)
+            with self._db:
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, "
+                    "value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_expires_at "
+                    f"ON {table} (expires_at)"
+                )
+
+    def get(self, key):
+        """Returns the cached value for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        row = None
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+        with self._lock:
+            if row and row[1] > now:
+                value = json.loads(row[0])
+                self._store(key, value, row[1])
+                self.hits += 1
+                return value
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        """Stores a JSON-serialisable value under key for ttl seconds.
+        The SQLite copy is written in the background."""
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+        if self._db is not None:
+            self._writer.submit(self._write, key, json.dumps(value), expires_at)
+
+    def _write(self, key, value, expires_at):
+        """Upserts one row, then prunes expired rows and the soonest to
+        expire beyond max_rows. Runs on the writer thread."""
+        with self._db_lock, self._db:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._db.execute(
+                f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)
+            )
+            count = self._db.execute(f"SELECT count(*) FROM {self.table}").fetchone()[0]
+            if count > self.max_rows:
+                self._db.execute(
+                    f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM "
+                    f"{self.table} ORDER BY expires_at LIMIT ?)",
+                    (count - self.max_rows,),
+                )
+
+    def flush(self):
+        """Waits until every queued SQLite write has been applied."""
+        if self._db is not None:
+            self._writer.submit(lambda: None).result()
+
+    def clear(self):
+        """Removes every entry from memory and from the persistent store."""
+        with self._lock:
+            self._entries.clear()
+        if self._db is not None:
+            self.flush()
+            with self._db_lock, self._db:
+                self._db.execute(f"DELETE FROM {self.table}")
+
+    def stats(self):
+        """Returns hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key, value, expires_at):
+        """Inserts into the in-memory LRU, evicting the oldest entries."""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+def normalize_url(api_url):
+    """Normalises an OpenAlex URL into a cache key: lower-case host,
+    sorted query parameters, mailto dropped."""
+    parts = urlsplit(api_url)
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k != "mailto"
+    )
+    return urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower(),
+            parts.path.rstrip("/"),
+            urlencode(query),
+            "",
+        )
+    )
+
+
+def get_ttl(api_url):
+    """Returns the time-to-live for an OpenAlex URL based on its endpoint."""
+    endpoint = get_endpoint(api_url)
+    parts = urlsplit(api_url)
+    # Batched lookups by ID or DOI return entities, not search results
+    is_entity = parts.path.strip("/").count("/") >= 1 or (
+        "search=" not in parts.query
+        and any(f"filter={f}:" in parts.query for f in ("ids.openalex", "doi"))
+    )
+    if endpoint == "topics":
+        return TOPICS_TTL
+    if endpoint == "works" and not is_entity:
+        return WORKS_SEARCH_TTL
+    if is_entity or endpoint in ("authors", "institutions"):
+        return ENTITY_TTL
+    return DEFAULT_TTL
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Returns the process-wide OpenAlex response cache."""
+    global _response_cache  # pylint: disable=global-statement
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                db_path = CACHE_PATH
+                if db_path and not os.path.isabs(db_path):
+                    db_path = str(BASE_DIR / db_path)
+                _response_cache = ResponseCache(
+                    CACHE_SIZE, db_path, max_rows=CACHE_MAX_ROWS
+                )
+    return _response_cache
@@ -0,0 +1,61 @@
+"""Request Coalescing Services"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key: the first caller
+    (the leader) runs the call, and callers arriving while it is in flight
+    wait for its result instead of repeating it. Nothing is cached once
+    the call has finished."""
+
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """Returns (future, is_leader) for a call. The leader must pass its
+        outcome to finish(); everyone else waits on the future."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        """Publishes the leader's result or exception to the waiting callers."""
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, function):
+        """Runs function once for all concurrent callers with the same key.
+        Returns (result, shared), shared being True for the waiting callers."""
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = function()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result, False
+
+    def metrics(self):
+        """Returns the calls in flight, made, and served from another call."""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "requests": self.leaders,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,73 @@
+"""Tool Output Encoding"""
+
+import json
+import os
+from tracing import span
+
+# 'compact' sends minified, columnar tool outputs; 'pretty' keeps indent=4 JSON
+TOOL_OUTPUT_MODE = os.getenv("TOOL_OUTPUT_MODE", "compact")
+# Work fields sent to the model, in column order
+TOOL_OUTPUT_FIELDS = os.getenv(
+    "TOOL_OUTPUT_FIELDS",
+    "id,doi,name,publication_year,authors,institutions,landing_page_url,pdf_url",
+).split(",")
+MAX_AUTHORS = int(os.getenv("TOOL_OUTPUT_MAX_AUTHORS", "3"))
+MAX_AFFILIATIONS = int(os.getenv("TOOL_OUTPUT_MAX_AFFILIATIONS", "1"))
+
+
+def encode_json(data, mode=None):
+    """Serialises a tool output as minified or pretty-printed JSON."""
+    with span("serialize.json") as json_span:
+        if (mode or TOOL_OUTPUT_MODE) == "pretty":
+            output = json.dumps(data, indent=4)
+        else:
+            output = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        json_span.set(bytes=len(output))
+        return output
+
+
+def summarize_authorships(authorships, institution_ids):
+    """Returns truncated author names and indices into the shared
+    institution table for the first MAX_AUTHORS authors."""
+    authors = [authorship["author"] for authorship in authorships[:MAX_AUTHORS]]
+    if len(authorships) > MAX_AUTHORS:
+        authors.append(f"+{len(authorships) - MAX_AUTHORS} more")
+
+    institutions = []
+    for authorship in authorships[:MAX_AUTHORS]:
+        for institution in authorship["institutions"][:MAX_AFFILIATIONS]:
+            index = institution_ids.setdefault(institution, len(institution_ids))
+            if index not in institutions:
+                institutions.append(index)
+    return authors, institutions
+
+
+def encode_works(works, fields=None, mode=None):
+    """Encodes processed works for the model.
+    In compact mode the works become one header row plus value rows, author
+    lists are truncated and affiliation strings are deduplicated into a
+    shared institutions table referenced by index."""
+    if (mode or TOOL_OUTPUT_MODE) == "pretty":
+        return encode_json(works, "pretty")
+
+    fields = fields or TOOL_OUTPUT_FIELDS
+    institution_ids = {}
+    rows = []
+    for work in works:
+        authors, institutions = summarize_authorships(
+            work.get("authorships", []), institution_ids
+        )
+        derived = {"authors": authors, "institutions": institutions}
+        rows.append([derived.get(field, work.get(field)) for field in fields])
+
+    return encode_json(
+        {
+            "columns": fields,
+            "rows": rows,
+            "institutions": list(institution_ids),
+            "note": (
+                "Author and affiliation lists are truncated. "
+                "Call get_work_details with work ids for the full records."
+            ),
+        }
+    )
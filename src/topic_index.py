@@ -0,0 +1,103 @@
+"""Topic Index Services"""
+
+import bisect
+import csv
+import os
+import threading
+from constants import BASE_DIR
+
+data_path = BASE_DIR / "src" / "topics_mapping.csv"
+
+HIERARCHY_COLUMNS = [
+    "subfield_id",
+    "subfield_name",
+    "field_id",
+    "field_name",
+    "domain_id",
+    "domain_name",
+]
+
+
+class TopicIndex:
+    """Read-only lookup tables over topics_mapping.csv.
+    Built once per file version and never mutated afterwards, so a single
+    instance can be shared by every Streamlit session."""
+
+    def __init__(self, records, version=None):
+        self.version = version
+        self.records = tuple(records)
+        self._by_id = {}
+        self._by_name = {}
+        self._by_lower_name = {}
+        for record in self.records:
+            self._by_id[record["topic_id"]] = record
+            self._by_name.setdefault(record["topic_name"], record)
+            self._by_lower_name.setdefault(record["topic_name"].casefold(), record)
+        self._sorted_lower_names = sorted(self._by_lower_name)
+
+    @classmethod
+    def from_csv(cls, path=data_path):
+        """Builds the index from a topics_mapping.csv file."""
+        stat = os.stat(path)
+        with open(path, "r", newline="", encoding="utf-8") as fs:
+            records = list(csv.DictReader(fs))
+        return cls(records, (stat.st_mtime_ns, stat.st_size))
+
+    def __len__(self):
+        return len(self.records)
+
+    def get_id(self, topic_name, case_sensitive=True):
+        """Returns the topic ID for an exact topic name, or None."""
+        if case_sensitive:
+            record = self._by_name.get(topic_name)
+        else:
+            record = self._by_lower_name.get(topic_name.strip().casefold())
+        return record["topic_id"] if record else None
+
+    def get_name(self, topic_id):
+        """Returns the topic name for a topic ID, or None."""
+        record = self._by_id.get(topic_id.upper())
+        return record["topic_name"] if record else None
+
+    def get(self, topic_id):
+        """Returns the full topic record for a topic ID, or None."""
+        return self._by_id.get(topic_id.upper())
+
+    def get_hierarchy(self, topic_id):
+        """Returns the subfield/field/domain of a topic, or None."""
+        record = self._by_id.get(topic_id.upper())
+        if record is None:
+            return None
+        return {column: record[column] for column in HIERARCHY_COLUMNS}
+
+    def search_prefix(self, prefix, limit=10):
+        """Returns up to limit (topic_id, topic_name) pairs whose name starts
+        with prefix, case-insensitively."""
+        prefix = prefix.strip().casefold()
+        start = bisect.bisect_left(self._sorted_lower_names, prefix)
+        matches = []
+        for name in self._sorted_lower_names[start : start + limit]:
+            if not name.startswith(prefix):
+                break
+            record = self._by_lower_name[name]
+            matches.append((record["topic_id"], record["topic_name"]))
+        return matches
+
+
+_topic_index = None
+_topic_index_lock = threading.Lock()
+
+
+def get_topic_index(path=data_path):
+    """Returns the process-wide topic index, rebuilding it when the CSV
+    file has changed on disk."""
+    global _topic_index  # pylint: disable=global-statement
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    index = _topic_index
+    if index is not None and index.version == version:
+        return index
+    with _topic_index_lock:
+        if _topic_index is None or _topic_index.version != version:
+            _topic_index = TopicIndex.from_csv(path)
+        return _topic_index
@@ -0,0 +1,98 @@
+"""Topic Search Prefetch Services"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Recommended topics whose first page of works is fetched before the user picks
+TOPIC_PREFETCH_COUNT = int(os.getenv("TOPIC_PREFETCH_COUNT", "3"))
+# Upper bound on speculative OpenAlex requests made for one session
+TOPIC_PREFETCH_BUDGET = int(os.getenv("TOPIC_PREFETCH_BUDGET", "30"))
+TOPIC_PREFETCH_WORKERS = int(os.getenv("TOPIC_PREFETCH_WORKERS", "4"))
+MAX_PREFETCH_SESSIONS = int(os.getenv("MAX_PREFETCH_SESSIONS", "1000"))
+
+topic_prefetch_executor = ThreadPoolExecutor(max_workers=TOPIC_PREFETCH_WORKERS)
+
+
+class TopicPrefetcher:
+    """Holds a session's speculative works searches, keyed by search URL.
+    Each search is a future of the (works, next_cursor) first page. A new
+    set of searches cancels the pending ones it no longer contains; searches
+    already running finish and only warm the response cache. Every HTTP
+    request a search makes counts against the session budget (a fanned-out
+    search makes one per keyword variant), and a search that is cancelled
+    before it runs is refunded."""
+
+    def __init__(self, budget=TOPIC_PREFETCH_BUDGET, executor=topic_prefetch_executor):
+        self.budget = budget
+        self.executor = executor
+        self.requests_made = 0
+        self._searches = {}
+        self._lock = threading.Lock()
+
+    def prefetch(self, searches):
+        """Starts the searches in a dict of url -> (fetch callable, number of
+        requests it makes), replacing the previous ones. Returns the number
+        of searches started."""
+        with self._lock:
+            for api_url in set(self._searches) - set(searches):
+                self._cancel(self._searches.pop(api_url))
+            started = 0
+            for api_url, (fetch, request_count) in searches.items():
+                if api_url in self._searches:
+                    continue
+                if self.requests_made + request_count > self.budget:
+                    break
+                self._searches[api_url] = (self.executor.submit(fetch), request_count)
+                self.requests_made += request_count
+                started += 1
+            return started
+
+    def take(self, api_url):
+        """Removes and returns the future of a prefetched search, or None."""
+        with self._lock:
+            future, _ = self._searches.pop(api_url, (None, 0))
+            return future
+
+    def _cancel(self, search):
+        """Cancels a search, refunding the budget if it never ran."""
+        future, request_count = search
+        if future.cancel():
+            self.requests_made -= request_count
+
+    def close(self):
+        """Cancels every pending search."""
+        with self._lock:
+            for search in self._searches.values():
+                self._cancel(search)
+            self._searches = {}
+
+
+_prefetchers = OrderedDict()
+_prefetchers_lock = threading.Lock()
+
+
+def get_session_prefetcher(session_id):
+    """Returns the topic prefetcher of a session, creating it if needed."""
+    with _prefetchers_lock:
+        prefetcher = _prefetchers.get(session_id)
+        if prefetcher is not None:
+            _prefetchers.move_to_end(session_id)
+            return prefetcher
+        prefetcher = _prefetchers[session_id] = TopicPrefetcher()
+        evicted = []
+        while len(_prefetchers) > MAX_PREFETCH_SESSIONS:
+            evicted.append(_prefetchers.popitem(last=False)[1])
+    for old in evicted:
+        old.close()
+    return prefetcher
+
+
+def take_prefetched_search(session_id, api_url):
+    """Returns the future of a search prefetched for a session, or None."""
+    if session_id is None:
+        return None
+    with _prefetchers_lock:
+        prefetcher = _prefetchers.get(session_id)
+    return prefetcher.take(api_url) if prefetcher is not None else None
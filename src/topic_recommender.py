@@ -0,0 +1,172 @@
+"""Local Topic Recommendation Services"""
+
+import json
+import os
+import re
+import shutil
+import threading
+from collections import Counter
+from urllib.parse import unquote
+import numpy as np
+from scipy import sparse
+from constants import BASE_DIR
+from query_fanout import reciprocal_rank
+from topic_index import get_topic_index
+
+CACHE_DIR = BASE_DIR / "src" / ".cache" / "topic_recommender"
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TEXT_COLUMNS = ["topic_name", "keywords", "description", "siblings"]
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this "
+    "to with within using based their its study studies research".split()
+)
+
+
+def tokenize(text):
+    """Lower-cases text and splits it into indexable terms."""
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+class TopicRecommender:
+    """BM25 ranking over the keywords, description and siblings of every
+    topic. Term weights are precomputed into a column-major sparse matrix,
+    so scoring a query is one column slice and one row sum."""
+
+    def __init__(self, topic_ids, vocabulary, weights, version=None):
+        self.topic_ids = topic_ids
+        self.vocabulary = vocabulary
+        self.weights = weights
+        self.version = version
+
+    @classmethod
+    def build(cls, records, version=None):
+        """Builds BM25 weights from topic records."""
+        vocabulary = {}
+        rows, cols, counts, lengths = [], [], [], []
+        for row, record in enumerate(records):
+            tokens = tokenize(" ".join(str(record[c]) for c in TEXT_COLUMNS))
+            lengths.append(len(tokens))
+            for token, count in Counter(tokens).items():
+                rows.append(row)
+                cols.append(vocabulary.setdefault(token, len(vocabulary)))
+                counts.append(count)
+
+        shape = (len(records), len(vocabulary))
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        tf = np.asarray(counts, dtype=np.float32)
+        doc_lengths = np.asarray(lengths, dtype=np.float32)
+
+        doc_freq = np.bincount(cols, minlength=shape[1]).astype(np.float32)
+        idf = np.log1p((shape[0] - doc_freq + 0.5) / (doc_freq + 0.5))
+        avg_length = doc_lengths.mean() if len(doc_lengths) else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths[rows] / avg_length)
+        data = idf[cols] * tf * (BM25_K1 + 1) / (tf + norm)
+
+        weights = sparse.csc_matrix((data, (rows, cols)), shape=shape)
+        topic_ids = [record["topic_id"] for record in records]
+        return cls(topic_ids, vocabulary, weights, version)
+
+    def save(self, directory):
+        """Writes the matrix arrays and vocabulary so they can be memory-mapped."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(directory / "data.npy", self.weights.data.astype(np.float32))
+        np.save(directory / "indices.npy", self.weights.indices.astype(np.int32))
+        np.save(directory / "indptr.npy", self.weights.indptr.astype(np.int64))
+        meta = {
+            "shape": list(self.weights.shape),
+            "topic_ids": self.topic_ids,
+            "vocabulary": self.vocabulary,
+        }
+        tmp_path = directory / "meta.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fs:
+            json.dump(meta, fs)
+        os.replace(tmp_path, directory / "meta.json")
+
+    @classmethod
+    def load(cls, directory, version=None):
+        """Loads a saved recommender with its arrays memory-mapped."""
+        with open(directory / "meta.json", "r", encoding="utf-8") as fs:
+            meta = json.load(fs)
+        arrays = [
+            np.load(directory / f"{name}.npy", mmap_mode="r")
+            for name in ("data", "indices", "indptr")
+        ]
+        weights = sparse.csc_matrix(tuple(arrays), shape=tuple(meta["shape"]))
+        return cls(meta["topic_ids"], meta["vocabulary"], weights, version)
+
+    def recommend(self, keywords, k=10):
+        """Returns the top-k (topic_id, score) pairs for a keyword string."""
+        term_ids = sorted(
+            {self.vocabulary[t] for t in tokenize(keywords) if t in self.vocabulary}
+        )
+        if not term_ids:
+            return []
+        scores = np.asarray(self.weights[:, term_ids].sum(axis=1)).ravel()
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.topic_ids[i], float(scores[i])) for i in top]
+
+
+def merge_topic_rankings(local_ids, remote_ids, k=10):
+    """Merges two ranked lists of topic IDs with reciprocal rank fusion,
+    scored like the fused works of a fan-out search."""
+    scores = {}
+    for ranking in (local_ids, remote_ids):
+        for rank, topic_id in enumerate(ranking, start=1):
+            scores[topic_id] = scores.get(topic_id, 0.0) + reciprocal_rank(rank)
+    return sorted(scores, key=scores.get, reverse=True)[:k]
+
+
+_recommender = None
+_recommender_lock = threading.Lock()
+
+
+def get_topic_recommender():
+    """Returns the process-wide recommender for the current topics file.
+    The matrix is built once per topics_mapping.csv version, saved under
+    src/.cache and memory-mapped on later starts."""
+    global _recommender  # pylint: disable=global-statement
+    index = get_topic_index()
+    recommender = _recommender
+    if recommender is not None and recommender.version == index.version:
+        return recommender
+    with _recommender_lock:
+        if _recommender is None or _recommender.version != index.version:
+            directory = CACHE_DIR / "{}-{}".format(*index.version)
+            if (directory / "meta.json").exists():
+                _recommender = TopicRecommender.load(directory, index.version)
+            else:
+                _recommender = TopicRecommender.build(index.records, index.version)
+                _recommender.save(directory)
+                remove_stale_recommenders(directory)
+        return _recommender
+
+
+def remove_stale_recommenders(directory):
+    """Deletes the recommenders saved for earlier topics file versions."""
+    for path in CACHE_DIR.iterdir():
+        if path.is_dir() and path != directory:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def recommend_topics(keywords_query, k=10):
+    """Returns the top-k topics for a keyword query as {id, name} dicts."""
+    index = get_topic_index()
+    keywords = unquote(keywords_query)
+    return [
+        {"id": topic_id, "name": index.get_name(topic_id)}
+        for topic_id, _ in get_topic_recommender().recommend(keywords, k)
+    ]
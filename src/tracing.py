@@ -0,0 +1,234 @@
+"""Tracing Services"""
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from functools import partial, wraps
+from constants import BASE_DIR
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # opentelemetry is only needed for TRACE_EXPORTER=otel
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated span exporters: none, jsonl, otel
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_PATH = os.getenv("TRACE_PATH", str(BASE_DIR / "src" / ".cache" / "traces.jsonl"))
+# Show a waterfall of the last turn's spans in the Streamlit sidebar
+TRACE_DEBUG_PANEL = os.getenv("TRACE_DEBUG_PANEL", "false").lower() == "true"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation with attributes, nested under the span that was
+    current when it started. Finished spans are appended to the trace list
+    shared by every span of the same root, and passed to the exporters."""
+
+    def __init__(self, name, parent=None, attributes=None):
+        self.name = name
+        self.attributes = attributes or {}
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.trace = parent.trace if parent else []
+        self.start_time = None
+        self.duration = None
+        self.error = None
+        self._started = None
+        self._token = None
+
+    def set(self, **attributes):
+        """Adds attributes to the span."""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self._token = _current_span.set(self)
+        for exporter in _exporters:
+            exporter.on_start(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._started
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current_span.reset(self._token)
+        except ValueError:  # a generator closed from another context
+            _current_span.set(None)
+        self.trace.append(self)
+        for exporter in _exporters:
+            try:
+                exporter.on_end(self)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("❌ Span exporter failed.")
+        return False
+
+    def to_dict(self):
+        """Returns the span as a JSON-serialisable dictionary."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class NoopSpan:
+    """Stands in for every span while tracing is disabled."""
+
+    trace = ()
+
+    def set(self, **attributes):
+        """Ignores the attributes."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class JsonlSpanExporter:
+    """Appends every finished span to a JSON Lines file."""
+
+    def __init__(self, path=TRACE_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fs = open(  # pylint: disable=consider-using-with
+            path, "a", encoding="utf-8"
+        )
+        self._lock = threading.Lock()
+
+    def on_start(self, span):
+        """Nothing is written until the span ends."""
+
+    def on_end(self, span):
+        """Writes the span as one JSON line."""
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._fs.write(line + "\n")
+            self._fs.flush()
+
+
+class OpenTelemetrySpanExporter:
+    """Mirrors spans into the OpenTelemetry tracer provider configured by the
+    application, so they reach any OTLP-compatible backend."""
+
+    def __init__(self):
+        if otel_trace is None:
+            raise RuntimeError("TRACE_EXPORTER=otel requires opentelemetry-api.")
+        self._tracer = otel_trace.get_tracer("saira")
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span):
+        """Starts the matching OpenTelemetry span under its parent."""
+        with self._lock:
+            parent = self._spans.get(span.parent_id)
+        context = otel_trace.set_span_in_context(parent) if parent else None
+        otel_span = self._tracer.start_span(
+            span.name, context=context, start_time=int(span.start_time * 1e9)
+        )
+        with self._lock:
+            self._spans[span.span_id] = otel_span
+
+    def on_end(self, span):
+        """Copies the attributes and ends the matching OpenTelemetry span."""
+        with self._lock:
+            otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            if value is not None:
+                otel_span.set_attribute(key, value)
+        if span.error:
+            otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR))
+            otel_span.set_attribute("error", span.error)
+        otel_span.end(end_time=int((span.start_time + span.duration) * 1e9))
+
+
+SPAN_EXPORTERS = {
+    "jsonl": JsonlSpanExporter,
+    "otel": OpenTelemetrySpanExporter,
+}
+
+
+def create_exporters(names):
+    """Creates the exporters named in a comma-separated string."""
+    exporters = []
+    for name in filter(None, (n.strip() for n in names.split(","))):
+        if name == "none":
+            continue
+        if name not in SPAN_EXPORTERS:
+            raise ValueError(f"Unknown trace exporter: {name}")
+        exporters.append(SPAN_EXPORTERS[name]())
+    return exporters
+
+
+_exporters = create_exporters(TRACE_EXPORTER)
+_enabled = bool(_exporters) or TRACE_DEBUG_PANEL
+
+
+def configure(exporters=None, enabled=None):
+    """Replaces the span exporters and turns tracing on or off.
+    Tracing is enabled whenever an exporter is set, unless told otherwise."""
+    global _exporters, _enabled  # pylint: disable=global-statement
+    _exporters = list(exporters or [])
+    _enabled = bool(_exporters) if enabled is None else enabled
+
+
+def is_enabled():
+    """Whether spans are being recorded."""
+    return _enabled
+
+
+def span(name, **attributes):
+    """Returns a span context manager nested under the current span.
+    While tracing is disabled this is a shared no-op object."""
+    if not _enabled:
+        return NOOP_SPAN
+    return Span(name, _current_span.get(), attributes)
+
+
+def current_span():
+    """Returns the innermost active span (a no-op span if there is none)."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name):
+    """Decorates a function so every call runs inside a span."""
+
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def bind_context(function):
+    """Carries the current span into a function that runs on another thread,
+    so its spans are nested under the caller's."""
+    if not _enabled:
+        return function
+    return partial(contextvars.copy_context().run, function)
@@ -0,0 +1,102 @@
+"""Works Pagination Services"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Upper bound on sessions with an open result pager
+MAX_PAGER_SESSIONS = int(os.getenv("MAX_PAGER_SESSIONS", "1000"))
+PREFETCH_WORKERS = int(os.getenv("PAGER_PREFETCH_WORKERS", "4"))
+
+prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+
+
+class WorksPager:
+    """Lazily walks OpenAlex cursor pages of a works query.
+    fetch_page(cursor) must return (works, next_cursor), or None on failure.
+    While one page is being shown the next one is fetched in the background.
+    At most one page beyond the current one is held, so memory per session
+    is bounded by two pages of works. last_page is the page served last."""
+
+    def __init__(self, fetch_page, executor=prefetch_executor):
+        self.fetch_page = fetch_page
+        self.executor = executor
+        self.cursor = "*"
+        self.pages_served = 0
+        self.works_served = 0
+        self.last_page = []
+        self.exhausted = False
+        self._prefetch = None
+        self._lock = threading.Lock()
+
+    def next_page(self):
+        """Returns the next page of works, [] when exhausted, None on failure."""
+        with self._lock:
+            if self.exhausted:
+                return []
+            future, self._prefetch = self._prefetch, None
+            page = future.result() if future else self.fetch_page(self.cursor)
+            if page is None:
+                return None
+            return self._serve(page)
+
+    def serve_fetched(self, page):
+        """Serves a first page fetched elsewhere (e.g. by the async client)
+        and starts prefetching the page after it."""
+        with self._lock:
+            return self._serve(page)
+
+    def _serve(self, page):
+        """Advances the cursor past page and schedules the next prefetch."""
+        works, next_cursor = page
+        self.pages_served += 1
+        self.works_served += len(works)
+        self.last_page = works
+        self.cursor = next_cursor
+        if not works or not next_cursor:
+            self.exhausted = True
+        else:
+            self._prefetch = self.executor.submit(self.fetch_page, next_cursor)
+        return works
+
+    def __iter__(self):
+        """Yields works one page at a time until the results are exhausted."""
+        while True:
+            works = self.next_page()
+            if not works:
+                return
+            yield works
+
+    def close(self):
+        """Cancels any background prefetch and marks the pager exhausted."""
+        with self._lock:
+            if self._prefetch is not None:
+                self._prefetch.cancel()
+                self._prefetch = None
+            self.exhausted = True
+
+
+_pagers = OrderedDict()
+_pagers_lock = threading.Lock()
+
+
+def set_session_pager(session_id, pager):
+    """Makes pager the active result pager of a session, closing the old one."""
+    with _pagers_lock:
+        previous = _pagers.pop(session_id, None)
+        _pagers[session_id] = pager
+        while len(_pagers) > MAX_PAGER_SESSIONS:
+            _, evicted = _pagers.popitem(last=False)
+            evicted.close()
+    if previous is not None:
+        previous.close()
+
+
+def get_session_pager(session_id):
+    """Returns the active result pager of a session, or None."""
+    with _pagers_lock:
+        pager = _pagers.get(session_id)
+        if pager is not None:
+            _pagers.move_to_end(session_id)
+        return pager
@@ -0,0 +1,268 @@
+"""Works Store Services"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from constants import BASE_DIR
+from openalex_client import strip_openalex_prefix
+from tracing import bind_context, span
+
+logger = logging.getLogger(__name__)
+
+# Every work fetched from OpenAlex is kept here for local full-text search.
+# Set to an empty string to turn the store off, or ':memory:' to keep it in process.
+WORKS_STORE_PATH = os.getenv(
+    "WORKS_STORE_PATH", str(BASE_DIR / "src" / ".cache" / "works.sqlite")
+)
+# Upper bound on stored works; the least recently seen are evicted first
+WORKS_STORE_MAX_WORKS = int(os.getenv("WORKS_STORE_MAX_WORKS", "50000"))
+WORKS_STORE_RESULTS = 20
+
+# Tokens of a free-text query, matched as quoted FTS5 terms
+QUERY_TOKEN_PATTERN = re.compile(r"\w+")
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS works ("
+    "work_key INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, doi TEXT, title TEXT, "
+    "abstract TEXT, authors TEXT, affiliations TEXT, publication_year INTEGER, "
+    "last_seen REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS works_last_seen ON works (last_seen)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS works_fts USING fts5("
+    "title, abstract, authors, affiliations, content='works', "
+    "content_rowid='work_key', tokenize='porter unicode61 remove_diacritics 2')",
+    # Keep the external-content index in step with the works table
+    "CREATE TRIGGER IF NOT EXISTS works_ai AFTER INSERT ON works BEGIN "
+    "INSERT INTO works_fts (rowid, title, abstract, authors, affiliations) "
+    "VALUES (new.work_key, new.title, new.abstract, new.authors, new.affiliations); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS works_ad AFTER DELETE ON works BEGIN "
+    "INSERT INTO works_fts (works_fts, rowid, title, abstract, authors, affiliations) "
+    "VALUES ('delete', old.work_key, old.title, old.abstract, old.authors, "
+    "old.affiliations); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS works_au AFTER UPDATE OF "
+    "title, abstract, authors, affiliations ON works "
+    "WHEN old.title IS NOT new.title OR old.abstract IS NOT new.abstract "
+    "OR old.authors IS NOT new.authors OR old.affiliations IS NOT new.affiliations "
+    "BEGIN "
+    "INSERT INTO works_fts (works_fts, rowid, title, abstract, authors, affiliations) "
+    "VALUES ('delete', old.work_key, old.title, old.abstract, old.authors, "
+    "old.affiliations); "
+    "INSERT INTO works_fts (rowid, title, abstract, authors, affiliations) "
+    "VALUES (new.work_key, new.title, new.abstract, new.authors, new.affiliations); "
+    "END",
+]
+
+# A field fetched without a value never overwrites one stored earlier
+UPSERT_SQL = (
+    "INSERT INTO works (id, doi, title, abstract, authors, affiliations, "
+    "publication_year, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET "
+    "doi = coalesce(excluded.doi, doi), "
+    "title = coalesce(excluded.title, title), "
+    "abstract = coalesce(excluded.abstract, abstract), "
+    "authors = coalesce(excluded.authors, authors), "
+    "affiliations = coalesce(excluded.affiliations, affiliations), "
+    "publication_year = coalesce(excluded.publication_year, publication_year), "
+    "last_seen = excluded.last_seen"
+)
+
+# Column weights for bm25(): title, abstract, authors, affiliations
+SEARCH_SQL = (
+    "SELECT w.id, w.doi, w.title, w.publication_year, w.authors, "
+    "snippet(works_fts, 1, '[', ']', '…', 24) "
+    "FROM works_fts JOIN works w ON w.work_key = works_fts.rowid "
+    "WHERE works_fts MATCH ? ORDER BY bm25(works_fts, 10.0, 1.0, 5.0, 2.0) LIMIT ?"
+)
+
+
+def rebuild_abstract(inverted_index):
+    """Rebuilds an abstract from OpenAlex's abstract_inverted_index,
+    which maps every word to the positions it appears at."""
+    if not inverted_index:
+        return None
+    positions = {
+        position: word
+        for word, word_positions in inverted_index.items()
+        for position in word_positions
+    }
+    return " ".join(positions[position] for position in sorted(positions))
+
+
+def get_display_name(entity):
+    """Returns the name of a raw OpenAlex entity, or a name given as is."""
+    return entity.get("display_name") if isinstance(entity, dict) else entity
+
+
+def extract_work_row(result, seen_at):
+    """Returns the works table row of a raw OpenAlex work, or of a work as
+    process_results() returns it."""
+    authors, affiliations = [], []
+    for authorship in result.get("authorships") or []:
+        if get_display_name(authorship.get("author")):
+            authors.append(get_display_name(authorship["author"]))
+        affiliations.extend(authorship.get("raw_affiliation_strings") or [])
+        for institution in authorship.get("institutions") or []:
+            if get_display_name(institution):
+                affiliations.append(get_display_name(institution))
+    return (
+        strip_openalex_prefix(result["id"]),
+        result.get("doi"),
+        result.get("display_name") or result.get("title") or result.get("name"),
+        rebuild_abstract(result.get("abstract_inverted_index")),
+        " , ".join(authors) or None,
+        " ; ".join(dict.fromkeys(affiliations)) or None,
+        result.get("publication_year"),
+        seen_at,
+    )
+
+
+def build_match_query(query, author=""):
+    """Builds an FTS5 MATCH expression: every query word anywhere in a
+    work, and every author word in its author names. Words are quoted so
+    user text can never be read as FTS5 syntax."""
+    terms = [f'"{token}"' for token in QUERY_TOKEN_PATTERN.findall(query or "")]
+    author_terms = [f'"{token}"' for token in QUERY_TOKEN_PATTERN.findall(author or "")]
+    parts = []
+    if terms:
+        parts.append(" AND ".join(terms))
+    if author_terms:
+        parts.append(f"authors : ({' AND '.join(author_terms)})")
+    return " AND ".join(parts)
+
+
+class WorksStore:
+    """Persists every work fetched from OpenAlex in SQLite, with an FTS5
+    index over title, abstract, authors and affiliations. Works are
+    upserted as they are seen, so later fetches fill in missing fields,
+    and the least recently seen are evicted beyond max_works."""
+
+    def __init__(self, db_path=WORKS_STORE_PATH, max_works=WORKS_STORE_MAX_WORKS):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.max_works = max_works
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Writes go through one background thread so fetches never wait on disk
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            for statement in SCHEMA:
+                self._db.execute(statement)
+            self._count = self._db.execute("SELECT count(*) FROM works").fetchone()[0]
+
+    def __len__(self):
+        return self._count
+
+    def add(self, results):
+        """Upserts raw OpenAlex works and evicts the oldest beyond max_works."""
+        seen_at = time.time()
+        rows = [
+            extract_work_row(result, seen_at)
+            for result in results
+            if result and result.get("id")
+        ]
+        if not rows:
+            return
+        with span("works_store.upsert", works=len(rows)), self._lock, self._db:
+            self._db.executemany(UPSERT_SQL, rows)
+            count = self._db.execute("SELECT count(*) FROM works").fetchone()[0]
+            if count > self.max_works:
+                self._db.execute(
+                    "DELETE FROM works WHERE work_key IN (SELECT work_key FROM works "
+                    "ORDER BY last_seen LIMIT ?)",
+                    (count - self.max_works,),
+                )
+                count = self.max_works
+            self._count = count
+
+    def add_async(self, results):
+        """Queues raw works to be upserted on the writer thread."""
+        future = self._writer.submit(bind_context(self.add), list(results))
+        future.add_done_callback(log_failed_write)
+        return future
+
+    def flush(self):
+        """Waits until every queued write has been applied."""
+        self._writer.submit(lambda: None).result()
+
+    def search(self, query, author="", limit=WORKS_STORE_RESULTS):
+        """Returns the stored works best matching the query and author,
+        with a snippet of the abstract around the matched words."""
+        match = build_match_query(query, author)
+        if not match:
+            return []
+        with span("works_store.search") as search_span, self._lock:
+            rows = self._db.execute(SEARCH_SQL, (match, limit)).fetchall()
+            if rows:
+                with self._db:
+                    self._db.execute(
+                        "UPDATE works SET last_seen = ? WHERE id IN "
+                        f"({', '.join('?' * len(rows))})",
+                        (time.time(), *(row[0] for row in rows)),
+                    )
+            search_span.set(results=len(rows))
+        return [
+            {
+                "id": work_id,
+                "doi": doi,
+                "name": title,
+                "publication_year": publication_year,
+                "authors": authors,
+                "abstract_snippet": snippet or None,
+            }
+            for work_id, doi, title, publication_year, authors, snippet in rows
+        ]
+
+
+def log_failed_write(future):
+    """Logs a background upsert that raised, instead of losing the error."""
+    if future.exception() is not None:
+        logger.error("❌ Works store write failed: %s", future.exception())
+
+
+_works_store = None
+_works_store_lock = threading.Lock()
+
+
+def get_works_store():
+    """Returns the process-wide works store, or None when WORKS_STORE_PATH
+    is empty or SQLite was built without FTS5."""
+    global _works_store  # pylint: disable=global-statement
+    if _works_store is None and WORKS_STORE_PATH:
+        with _works_store_lock:
+            if _works_store is None:
+                try:
+                    _works_store = WorksStore(WORKS_STORE_PATH, WORKS_STORE_MAX_WORKS)
+                except sqlite3.OperationalError as e:
+                    logger.warning("⚠️ Works store disabled: %s", e)
+                    _works_store = False
+    return _works_store if _works_store is not False else None
+
+
+def record_works(results):
+    """Adds raw OpenAlex works to the works store in the background."""
+    store = get_works_store()
+    if store is not None and results:
+        store.add_async(results)
+
+
+def search_stored_works(query, author=""):
+    """Searches every work fetched so far, for follow-up questions that
+    should not need another OpenAlex search."""
+    store = get_works_store()
+    if store is None:
+        return "❌ The local works store is turned off."
+    if not build_match_query(query, author):
+        return "❌ Give some words to search for, or an author name."
+    works = store.search(query, author)
+    if not works:
+        return (
+            "No previously retrieved works match. Use get_research_works "
+            "to search OpenAlex instead."
+        )
+    return works